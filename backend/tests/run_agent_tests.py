@@ -44,6 +44,7 @@ def main():
         (tests_dir / "test_validator.py", "Compliance Validation Agent"),
         (tests_dir / "test_comparison.py", "Comparison Agent"),
         (tests_dir / "test_integrated_analysis.py", "Integrated Analysis Agent"),
+        (tests_dir / "test_analysis_cache.py", "Analysis and Extraction Caches"),
     ]
     
     passed = 0
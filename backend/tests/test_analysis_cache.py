@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Test de las cachés de BiddingAnalysisSystem: análisis por (hash, tipo, nivel) y extracción por hash
+"""
+
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+# Agregar paths necesarios
+current_dir = Path(__file__).parent
+backend_dir = current_dir.parent
+sys.path.append(str(backend_dir))
+
+from utils.bidding import BiddingAnalysisSystem, _load_cached_extraction
+from utils.db_manager import get_analysis_path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SAMPLE_CONTENT = "Propuesta de construcción de obra. RUC 1790012345001. Garantía técnica. Plazo 12 meses."
+
+
+class CountingExtractor:
+    """Extractor de prueba: devuelve un contenido fijo y cuenta las llamadas"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def process_document(self, document_path):
+        self.calls += 1
+        return {"content": SAMPLE_CONTENT, "metadata": {"source": str(document_path)}}
+
+
+def make_system(work_dir: Path, extractor: CountingExtractor) -> BiddingAnalysisSystem:
+    """Sistema aislado en `work_dir` con el extractor de prueba y sin inicializar embeddings"""
+    system = BiddingAnalysisSystem(data_dir=work_dir / "data")
+    system.extract_cache_dir = work_dir / "extract_cache"
+    system.document_extractor = extractor
+    system.system_initialized = True
+    return system
+
+
+def test_analysis_cache_hit():
+    """El mismo contenido, tipo y nivel se recupera de caché, también desde otra instancia"""
+    logger.info("=== Test de Acierto en Caché de Análisis ===")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        document = work_dir / "propuesta.txt"
+        document.write_text("propuesta v1", encoding="utf-8")
+        extractor = CountingExtractor()
+
+        system = make_system(work_dir, extractor)
+        first = system.analyze_document(str(document), "proposal", "basic")
+        second = system.analyze_document(str(document), "proposal", "basic")
+        assert extractor.calls == 1, f"El extractor se llamó {extractor.calls} veces"
+        assert second["cached_from"] == first["document_id"]
+        assert second["document_id"] != first["document_id"]
+
+        # Otra instancia con el mismo data_dir encuentra el análisis en el índice en disco
+        third = make_system(work_dir, extractor).analyze_document(str(document), "proposal", "basic")
+        assert extractor.calls == 1, "La nueva instancia no usó el índice en disco"
+        assert third["cached_from"] == first["document_id"]
+
+        # Modificar el resultado devuelto no altera la caché
+        second["summary"]["modificado"] = True
+        fourth = system.analyze_document(str(document), "proposal", "basic")
+        assert "modificado" not in fourth["summary"]
+
+        logger.info("✅ Caché de análisis reutilizada en memoria y en disco")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error en test de acierto en caché: {e}")
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_analysis_cache_miss():
+    """Otro contenido, otro tipo o use_cache=False vuelven a analizar"""
+    logger.info("\n=== Test de Fallo en Caché de Análisis ===")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        document = work_dir / "propuesta.txt"
+        document.write_text("propuesta v1", encoding="utf-8")
+        extractor = CountingExtractor()
+        system = make_system(work_dir, extractor)
+
+        system.analyze_document(str(document), "proposal", "basic")
+
+        result = system.analyze_document(str(document), "proposal", "basic", use_cache=False)
+        assert "cached_from" not in result and extractor.calls == 2
+
+        result = system.analyze_document(str(document), "contract", "basic")
+        assert "cached_from" not in result, "Un tipo distinto no debe reutilizar el análisis"
+
+        # Mismo archivo con otro contenido: otro hash
+        document.write_text("propuesta v2", encoding="utf-8")
+        calls = extractor.calls
+        result = system.analyze_document(str(document), "proposal", "basic")
+        assert "cached_from" not in result and extractor.calls == calls + 1
+
+        logger.info("✅ Cambios de contenido, tipo o use_cache=False no usan la caché")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error en test de fallo en caché: {e}")
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_analysis_cache_invalidation():
+    """Si el analysis_result.json indexado ya no existe, el análisis se repite"""
+    logger.info("\n=== Test de Invalidación de Caché de Análisis ===")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        document = work_dir / "propuesta.txt"
+        document.write_text("propuesta v1", encoding="utf-8")
+        extractor = CountingExtractor()
+
+        first = make_system(work_dir, extractor).analyze_document(str(document), "proposal", "basic")
+        (get_analysis_path(first["document_id"]) / "analysis_result.json").unlink()
+
+        result = make_system(work_dir, extractor).analyze_document(str(document), "proposal", "basic")
+        assert "cached_from" not in result, "Se usó un análisis cuyo archivo fue borrado"
+
+        logger.info("✅ Un resultado borrado invalida la entrada de caché")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error en test de invalidación de caché: {e}")
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_extraction_cache():
+    """La extracción se guarda como JSON por hash y cada acierto devuelve un dict nuevo"""
+    logger.info("\n=== Test de Caché de Extracción ===")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        document = work_dir / "propuesta.txt"
+        document.write_text("propuesta v1", encoding="utf-8")
+        extractor = CountingExtractor()
+        system = make_system(work_dir, extractor)
+
+        first = system._extract_document(str(document))
+        cache_files = list(system.extract_cache_dir.glob("*.json"))
+        assert len(cache_files) == 1, f"Archivos de caché: {cache_files}"
+
+        second = system._extract_document(str(document))
+        assert extractor.calls == 1 and second == first
+
+        second["content"] = "modificado"
+        second["metadata"]["source"] = "modificado"
+        third = _load_cached_extraction(str(cache_files[0]))
+        assert third == first, "Una modificación se filtró a la caché de extracción"
+
+        system._extract_document(str(document), use_cache=False)
+        assert extractor.calls == 2
+
+        logger.info("✅ Caché de extracción en JSON con copias independientes")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error en test de caché de extracción: {e}")
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """Función principal del test"""
+    logger.info("🚀 Iniciando tests de caché de BiddingAnalysisSystem")
+
+    tests = [
+        ("Acierto en Caché de Análisis", test_analysis_cache_hit),
+        ("Fallo en Caché de Análisis", test_analysis_cache_miss),
+        ("Invalidación de Caché de Análisis", test_analysis_cache_invalidation),
+        ("Caché de Extracción", test_extraction_cache)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"🧪 Ejecutando: {test_name}")
+        logger.info('='*50)
+        success = test_func()
+        results.append((test_name, success))
+
+    # Resumen final
+    logger.info(f"\n{'='*50}")
+    logger.info("📊 RESUMEN DE TESTS")
+    logger.info('='*50)
+
+    passed = sum(1 for _, success in results if success)
+    total = len(results)
+
+    for test_name, success in results:
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"  {status} {test_name}")
+
+    logger.info(f"\n🏆 Resultado final: {passed}/{total} tests exitosos")
+    return passed == total
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -156,6 +156,55 @@ def test_technical_requirements():
         logger.warning(f"Documento no disponible para test técnico: {e}")
         return False
 
+def test_cedula_batch_validation():
+    """Test de validación en bloque de dígitos verificadores de cédula"""
+    logger.info("\n=== Test de Validación de Cédulas en Bloque ===")
+    
+    try:
+        db_path = backend_dir / "db" / "test_validator"
+        agent = ComplianceValidationAgent(vector_db_path=db_path, use_embeddings=False)
+        
+        cedulas = ["1712345678", "1790123456", "0912345678", "1760001550"]
+        batch = agent._validate_cedulas_batch(cedulas)
+        single = [agent._validate_ecuador_cedula(c).get('check_digit_valid', False) for c in cedulas]
+        
+        assert list(batch) == single, f"Resultados distintos: {batch} vs {single}"
+        logger.info("✅ Validación en bloque coincide con la validación individual")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error en test de cédulas en bloque: {e}")
+        return False
+
+def test_compliance_bytes_equivalence():
+    """Test de equivalencia entre contenido str y bytes UTF-8 en cumplimiento y fechas"""
+    logger.info("\n=== Test de Equivalencia str / bytes ===")
+    
+    try:
+        db_path = backend_dir / "db" / "test_validator"
+        agent = ComplianceValidationAgent(vector_db_path=db_path, use_embeddings=False)
+        
+        samples = [
+            "La garantía de fiel cumplimiento y el plazo de ejecución de 120 días se detallan en el PLIEGO.",
+            "Fecha límite de entrega: 15/03/2025. Propuesta técnica y económica con experiencia mínima.",
+            "CONTRATACIÓN PÚBLICA — Especificaciones técnicas, presupuesto referencial y forma de pago.",
+            "Documento sin requisitos: ñandú, acción, último día 2025-12-31.",
+            ""
+        ]
+        for sample in samples:
+            encoded = sample.encode("utf-8")
+            assert agent.validate_compliance_rules(sample) == agent.validate_compliance_rules(encoded), \
+                f"Cumplimiento distinto para: {sample!r}"
+            assert agent.validate_dates_and_deadlines(sample) == agent.validate_dates_and_deadlines(encoded), \
+                f"Fechas distintas para: {sample!r}"
+        
+        logger.info("✅ Los resultados con bytes coinciden con los de str")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error en test de equivalencia str / bytes: {e}")
+        return False
+
 def main():
     """Función principal del test"""
     logger.info("🚀 Iniciando tests del ComplianceValidationAgent")
@@ -164,7 +213,9 @@ def main():
         ("Validación Básica de Cumplimiento", test_basic_compliance_validation),
         ("Completitud de Documentos", test_document_completeness),
         ("Cumplimiento Regulatorio", test_regulatory_compliance),
-        ("Requisitos Técnicos", test_technical_requirements)
+        ("Requisitos Técnicos", test_technical_requirements),
+        ("Cédulas en Bloque", test_cedula_batch_validation),
+        ("Equivalencia str / bytes", test_compliance_bytes_equivalence)
     ]
     
     results = []
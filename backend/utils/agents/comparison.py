@@ -10,6 +10,9 @@ import re
 import json
 import hashlib
 import logging
+import sqlite3
+from array import array
+from contextlib import closing
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from datetime import datetime
@@ -26,6 +29,7 @@ from dspy import Signature, InputField, OutputField, Predict, Module
 
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 # Import metadata filtering utility
@@ -265,6 +269,88 @@ class EnhancedComparisonModule(Module):
         }
 
 
+class CachedEmbeddings(Embeddings):
+    """
+    Envoltura del proveedor de embeddings que recuerda el vector de cada texto (por su
+    sha256): los chunks ya embebidos no se vuelven a enviar al proveedor, y los que faltan
+    se piden en un solo lote. La memoria se acota a MAX_ENTRIES (se descarta lo más antiguo).
+
+    Con `store_path` los vectores también se guardan en SQLite, por texto y modelo, y
+    sobreviven a reinicios del proceso.
+    """
+
+    MAX_ENTRIES = 4096
+    # Claves por consulta IN (...) al almacén en disco
+    STORE_BATCH = 500
+
+    def __init__(self, provider: Embeddings, store_path: Optional[Path] = None):
+        self.provider = provider
+        self.model = f"{type(provider).__name__}:{getattr(provider, 'model', '')}"
+        self.store_path = store_path
+        self._vectors: Dict[str, List[float]] = {}
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _store(self) -> sqlite3.Connection:
+        Path(self.store_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.store_path))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL)"
+        )
+        return conn
+
+    def _load_stored(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Vectores de `keys` ya guardados en disco para el modelo actual."""
+        stored: Dict[str, List[float]] = {}
+        try:
+            with closing(self._store()) as conn:
+                for start in range(0, len(keys), self.STORE_BATCH):
+                    batch = {f"{key}|{self.model}": key for key in keys[start:start + self.STORE_BATCH]}
+                    rows = conn.execute(
+                        f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", list(batch)
+                    )
+                    for store_key, blob in rows:
+                        stored[batch[store_key]] = array("d", blob).tolist()
+        except sqlite3.Error as e:
+            logger.warning(f"No se pudo leer la caché de embeddings en disco: {e}")
+        return stored
+
+    def _save_stored(self, vectors: Dict[str, List[float]]) -> None:
+        try:
+            with closing(self._store()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vec) VALUES (?, ?, ?)",
+                    [(f"{key}|{self.model}", len(vector), array("d", vector).tobytes()) for key, vector in vectors.items()],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"No se pudo guardar la caché de embeddings en disco: {e}")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors = {key: self._vectors[key] for key in keys if key in self._vectors}
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing and self.store_path is not None:
+            for key, vector in self._load_stored(list(missing)).items():
+                vectors[key] = self._vectors[key] = vector
+                del missing[key]
+        if missing:
+            computed = dict(zip(missing, self.provider.embed_documents(list(missing.values()))))
+            for key, vector in computed.items():
+                vectors[key] = self._vectors[key] = vector
+            if self.store_path is not None:
+                self._save_stored(computed)
+        while len(self._vectors) > self.MAX_ENTRIES:
+            self._vectors.pop(next(iter(self._vectors)))
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.provider.embed_query(text)
+
+
 class ComparisonAgent:
     """
     Enhanced Unified agent for document and proposal comparison with DSPy intelligence.
@@ -335,7 +421,15 @@ class ComparisonAgent:
         self.documents: Dict[str, Any] = {}
         self.comparison_results: Dict[str, Any] = {}
         self.cached_embeddings: Dict[str, Any] = {}
+        # Caché de vectores por texto; sobrevive a clear_documents (ver _embedding_function)
+        self.embedding_cache: Optional[CachedEmbeddings] = None
         self.llm_provider = llm_provider
+        # El splitter no guarda estado: uno solo para todos los documentos
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200,
+            separators=["\n\n", "\n", ". ", " "],
+        )
         
         # Initialize integrated agents
         self.risk_analyzer = None
@@ -1030,13 +1124,7 @@ class ComparisonAgent:
 
         metadata = metadata or {}
 
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ". ", " "],
-        )
-
-        chunks = splitter.split_text(content)
+        chunks = self.text_splitter.split_text(content)
         documents: List[Document] = []
 
         for i, chunk in enumerate(chunks):
@@ -1077,6 +1165,17 @@ class ComparisonAgent:
 
         logger.info(f"Documento {doc_id} añadido con {len(documents)} chunks")
 
+    def add_documents(self, docs: List[Dict[str, Any]]):
+        """
+        Registra varios documentos de una vez (dicts con doc_id, content y, opcionalmente,
+        doc_type y metadata). Los embeddings de todos se calculan en un solo lote en
+        setup_vector_database().
+        """
+        for doc in docs:
+            self.add_document(
+                doc["doc_id"], doc["content"], doc_type=doc.get("doc_type", "proposal"), metadata=doc.get("metadata")
+            )
+
     # Aliases por compatibilidad
     def load_proposal(self, proposal_id: str, content: str, metadata: Optional[Dict] = None):
         return self.add_document(proposal_id, content, doc_type='proposal', metadata=metadata)
@@ -1125,7 +1224,7 @@ class ComparisonAgent:
             self.vector_db = Chroma(
                 collection_name="comparison",
                 persist_directory=str(self.vector_db_path),
-                embedding_function=self.embeddings_provider
+                embedding_function=self._embedding_function()
             )
             if all_documents:
                 self.vector_db.add_documents(all_documents, ids=ids)
@@ -1141,14 +1240,42 @@ class ComparisonAgent:
             logger.error(f"Error configurando base de datos vectorial: {e}")
             return False
 
+    def _embedding_function(self) -> CachedEmbeddings:
+        """Proveedor actual envuelto en la caché de embeddings (se renueva si cambia el proveedor)."""
+        if self.embedding_cache is None or self.embedding_cache.provider is not self.embeddings_provider:
+            self.embedding_cache = CachedEmbeddings(
+                self.embeddings_provider, store_path=Path(self.vector_db_path).parent / "embeddings.sqlite"
+            )
+        return self.embedding_cache
+
+    def _doc_profile(self, doc_id: str, kind: Any, compute):
+        """
+        Cálculo por documento memorizado en `documents[doc_id]['analysis']` (se descarta al
+        volver a añadir el documento): al comparar un documento contra N, su parte se hace una vez.
+        """
+        cache = self.documents[doc_id].setdefault('analysis', {})
+        if kind not in cache:
+            cache[kind] = compute(self.documents[doc_id]['content'])
+        return cache[kind]
+
+    def _semantic_words(self, doc_id: str) -> set:
+        """Palabras de los chunks más cercanos al inicio del documento (según la base vectorial actual)."""
+        cache = self.documents[doc_id].setdefault('analysis', {})
+        cached = cache.get('semantic_words')
+        if cached is None or cached[0] is not self.vector_db:
+            content = self.documents[doc_id]['content']
+            results = self.vector_db.similarity_search(content[:500], k=3, filter={'doc_id': doc_id})
+            chunks = ' '.join([doc.page_content for doc in results])
+            cached = cache['semantic_words'] = (
+                self.vector_db, set(re.findall(r'\b[a-záéíóúñ]{4,}\b', chunks.lower()))
+            )
+        return cached[1]
+
     def analyze_content_similarity(self, doc1_id: str, doc2_id: str) -> Dict[str, Any]:
         """Analiza similitud de contenido entre dos documentos."""
         if doc1_id not in self.documents or doc2_id not in self.documents:
             raise ValueError("Uno o ambos documentos no encontrados")
 
-        content1 = self.documents[doc1_id]['content']
-        content2 = self.documents[doc2_id]['content']
-
         similarity_analysis: Dict[str, Any] = {
             'comparison_type': 'content_similarity',
             'doc1_id': doc1_id,
@@ -1159,8 +1286,8 @@ class ComparisonAgent:
         }
 
         # Jaccard simple
-        words1 = set(re.findall(r'\b\w+\b', content1.lower()))
-        words2 = set(re.findall(r'\b\w+\b', content2.lower()))
+        words1 = self._doc_profile(doc1_id, 'words', lambda content: set(re.findall(r'\b\w+\b', content.lower())))
+        words2 = self._doc_profile(doc2_id, 'words', lambda content: set(re.findall(r'\b\w+\b', content.lower())))
         common_words = words1.intersection(words2)
         all_words = words1.union(words2)
         jaccard_similarity = len(common_words) / len(all_words) if all_words else 0
@@ -1174,18 +1301,8 @@ class ComparisonAgent:
         # Semántica si hay vector DB
         if self.vector_db:
             try:
-                results1 = self.vector_db.similarity_search(
-                    content1[:500], k=3, filter={'doc_id': doc1_id}
-                )
-                results2 = self.vector_db.similarity_search(
-                    content2[:500], k=3, filter={'doc_id': doc2_id}
-                )
-
-                content1_chunks = ' '.join([doc.page_content for doc in results1])
-                content2_chunks = ' '.join([doc.page_content for doc in results2])
-
-                semantic_words1 = set(re.findall(r'\b[a-záéíóúñ]{4,}\b', content1_chunks.lower()))
-                semantic_words2 = set(re.findall(r'\b[a-záéíóúñ]{4,}\b', content2_chunks.lower()))
+                semantic_words1 = self._semantic_words(doc1_id)
+                semantic_words2 = self._semantic_words(doc2_id)
 
                 semantic_common = semantic_words1.intersection(semantic_words2)
                 semantic_all = semantic_words1.union(semantic_words2)
@@ -1232,13 +1349,13 @@ class ComparisonAgent:
 
         for doc_id, analysis_key in [(doc1_id, 'doc1_analysis'), (doc2_id, 'doc2_analysis')]:
             content = self.documents[doc_id]['content']
-            found_sections, missing_sections = [], []
-
-            for section_pattern in required_sections:
-                if re.search(section_pattern, content, re.IGNORECASE):
-                    found_sections.append(section_pattern)
-                else:
-                    missing_sections.append(section_pattern)
+            section_hits = self._doc_profile(
+                doc_id,
+                ('sections', tuple(required_sections)),
+                lambda content: [bool(re.search(pattern, content, re.IGNORECASE)) for pattern in required_sections],
+            )
+            found_sections = [pattern for pattern, hit in zip(required_sections, section_hits) if hit]
+            missing_sections = [pattern for pattern, hit in zip(required_sections, section_hits) if not hit]
 
             structural_analysis[analysis_key] = {
                 'sections_found': len(found_sections),
@@ -1284,8 +1401,8 @@ class ComparisonAgent:
             'comparative_analysis': {}
         }
 
-        for doc_id, analysis_key in [(doc1_id, 'doc1_analysis'), (doc2_id, 'doc2_analysis')]:
-            content = self.documents[doc_id]['content'].lower()
+        def technical_profile(content: str) -> tuple:
+            content = content.lower()
             keyword_matches: Dict[str, int] = {}
             total_matches = 0
 
@@ -1303,12 +1420,18 @@ class ComparisonAgent:
             ]
 
             pattern_matches = sum(len(re.findall(pattern, content, re.IGNORECASE)) for pattern in technical_patterns)
+            return keyword_matches, total_matches, pattern_matches, len(content.split()) if content else 0
+
+        for doc_id, analysis_key in [(doc1_id, 'doc1_analysis'), (doc2_id, 'doc2_analysis')]:
+            keyword_matches, total_matches, pattern_matches, word_count = self._doc_profile(
+                doc_id, 'technical', technical_profile
+            )
 
             technical_analysis[analysis_key] = {
-                'keyword_matches': keyword_matches,
+                'keyword_matches': dict(keyword_matches),
                 'total_keyword_matches': total_matches,
                 'pattern_matches': pattern_matches,
-                'technical_density': total_matches / len(content.split()) * 1000 if content else 0,
+                'technical_density': total_matches / word_count * 1000 if self.documents[doc_id]['content'] else 0,
                 'technical_completeness_score': min(100, (total_matches + pattern_matches) * 2)
             }
 
@@ -1350,9 +1473,7 @@ class ComparisonAgent:
             'pago', 'facturación', 'anticipo', 'descuento', 'ahorro'
         ]
 
-        for doc_id, analysis_key in [(doc1_id, 'doc1_analysis'), (doc2_id, 'doc2_analysis')]:
-            content = self.documents[doc_id]['content']
-
+        def economic_profile(content: str) -> tuple:
             found_prices: List[float] = []
             for pattern in price_patterns:
                 matches = re.findall(pattern, content, re.IGNORECASE)
@@ -1367,9 +1488,13 @@ class ComparisonAgent:
 
             value_terms = ['descuento', 'bonificación', 'valor agregado', 'beneficio adicional', 'incluye']
             value_mentions = sum(len(re.findall(rf'\b{term}\b', content, re.IGNORECASE)) for term in value_terms)
+            return found_prices, economic_mentions, value_mentions
+
+        for doc_id, analysis_key in [(doc1_id, 'doc1_analysis'), (doc2_id, 'doc2_analysis')]:
+            found_prices, economic_mentions, value_mentions = self._doc_profile(doc_id, 'economic', economic_profile)
 
             economic_analysis[analysis_key] = {
-                'prices_found': found_prices,
+                'prices_found': list(found_prices),
                 'estimated_total_price': max(found_prices) if found_prices else None,
                 'economic_mentions': economic_mentions,
                 'value_added_mentions': value_mentions,
@@ -1560,12 +1685,13 @@ class ComparisonAgent:
 
         logger.info(f"Iniciando comparación comprehensiva entre {doc1_id} y {doc2_id} en modo {mode}")
 
+        now = datetime.now()
         comprehensive_comparison: Dict[str, Any] = {
-            'comparison_id': f"{doc1_id}_vs_{doc2_id}_{int(datetime.now().timestamp())}",
+            'comparison_id': f"{doc1_id}_vs_{doc2_id}_{int(now.timestamp())}",
             'doc1_id': doc1_id,
             'doc2_id': doc2_id,
             'comparison_mode': mode,
-            'comparison_timestamp': datetime.now().isoformat(),
+            'comparison_timestamp': now.isoformat(),
             'weights_used': weights,
             'dimension_analyses': {},
             'overall_scores': {},
@@ -357,6 +357,8 @@ class DocumentClassificationAgent:
     def __init__(self, document_path=None, vector_db_path=None, collection_name="DocumentClassification",
                  llm_provider="auto", llm_model=None):
         self.document_path = document_path
+        # Texto ya extraído del documento (.txt); si se asigna, no se vuelve a convertir el original
+        self.text_path = None
         self.llm_provider = llm_provider
         self.llm_model = llm_model
         
@@ -415,8 +417,12 @@ class DocumentClassificationAgent:
                     persist_directory=str(self.vector_db_path),
                     embedding_function=self.embeddings_provider
                 )
-                logger.info(f"Base de datos vectorial cargada desde {self.vector_db_path}")
-                return True
+                # Una colección vacía (p. ej. construcción interrumpida) se reconstruye desde el documento
+                if self.document_path and self.vector_db._collection.count() == 0:
+                    logger.info(f"BD vectorial vacía en {self.vector_db_path}, reconstruyendo")
+                else:
+                    logger.info(f"Base de datos vectorial cargada desde {self.vector_db_path}")
+                    return True
             except Exception as e:
                 logger.warning(f"Error cargando BD existente: {e}")
         
@@ -432,6 +438,24 @@ class DocumentClassificationAgent:
             )
             return True
     
+    def _document_txt_path(self) -> Path:
+        """Ruta .txt del documento; reutiliza el texto ya extraído (text_path) si está disponible"""
+        if self.text_path and Path(self.text_path).exists():
+            logger.info(f"Using pre-extracted text file: {self.text_path}")
+            return Path(self.text_path)
+        
+        doc_path = Path(self.document_path)
+        
+        # Check if it's already a text file
+        if doc_path.suffix.lower() == '.txt':
+            # If it's already a text file, use it directly
+            logger.info(f"Using existing text file: {doc_path}")
+            return doc_path
+        
+        # Convert document to PDF if needed, then extract text
+        pdf_path = DocumentExtractionAgent.to_pdf_if_needed(self.document_path)
+        return DocumentExtractionAgent.pdf_to_txt(pdf_path)
+    
     def _create_vector_db_from_document_tiktoken(self):
         """Crea la BD vectorial usando chunking estándar para documentos completos"""
         try:
@@ -440,18 +464,7 @@ class DocumentClassificationAgent:
                 raise ValueError(f"Document path does not exist: {self.document_path}")
             
             doc_path = Path(self.document_path)
-            
-            # Check if it's already a text file
-            if doc_path.suffix.lower() == '.txt':
-                # If it's already a text file, use it directly
-                txt_path = doc_path
-                logger.info(f"Using existing text file: {txt_path}")
-            else:
-                # Convert document to PDF if needed
-                pdf_path = DocumentExtractionAgent.to_pdf_if_needed(self.document_path)
-                
-                # Extract text
-                txt_path = DocumentExtractionAgent.pdf_to_txt(pdf_path)
+            txt_path = self._document_txt_path()
             
             # Create documents with standard chunking (2000 chars, 100 overlap)
             documents = txt_to_documents(
@@ -558,14 +571,7 @@ class DocumentClassificationAgent:
             self.dspy_module = DocumentClassificationModule(self.vector_db if self.vector_db else None, self.SECTION_TAXONOMY)
         
         # Get document text content
-        doc_path = Path(self.document_path)
-        
-        # Convert to text if needed
-        if doc_path.suffix.lower() == '.txt':
-            txt_path = doc_path
-        else:
-            pdf_path = DocumentExtractionAgent.to_pdf_if_needed(self.document_path)
-            txt_path = DocumentExtractionAgent.pdf_to_txt(pdf_path)
+        txt_path = self._document_txt_path()
         
         # Read text content
         with open(txt_path, 'r', encoding='utf-8') as f:
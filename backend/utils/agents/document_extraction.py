@@ -145,9 +145,9 @@ class DocumentExtractionAgent:
         txt_path.write_text(contenido, encoding="utf-8")
         return txt_path
 
-    def extract_text(self):
-        # Check both attribute names for compatibility
-        document_path = getattr(self, 'document', None) or self.document_path
+    def extract_text(self, document=None):
+        # Prefer the explicit argument (stateless, safe to share); fall back to the attributes
+        document_path = document or getattr(self, 'document', None) or self.document_path
         
         if document_path is None:
             raise ValueError("No document provided for extraction.")
@@ -204,14 +204,14 @@ class DocumentExtractionAgent:
         # TODO: Implement metadata extraction logic
         return {"title": "", "document_type": ""}
 
-    def process_document(self):
-        # Check both attribute names for compatibility
-        document_path = getattr(self, 'document', None) or self.document_path
+    def process_document(self, document=None):
+        # Prefer the explicit argument (stateless, safe to share); fall back to the attributes
+        document_path = document or getattr(self, 'document', None) or self.document_path
         
         if document_path is None:
             raise ValueError("No document provided for extraction.")
         
-        document_text = self.extract_text()
+        document_text = self.extract_text(document_path)
         # metadata = self.extract_metadata()
         return {
             "content": document_text
@@ -1,20 +1,206 @@
 import re
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Union, Iterator, TYPE_CHECKING
 from datetime import datetime
 import json
 import hashlib
-
-from langchain_chroma import Chroma
-from langchain_core.documents import Document
+import importlib.util
+import copy
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice, product, repeat
 
 # Importar utilidades del paquete (ajusta las rutas relativas según tu estructura)
 from ..db_manager import get_standard_db_path
-from ..embedding import get_embeddings_provider, detect_section_boundaries_semantic
+
+# Chroma, Document y ..embedding (que arrastran langchain/chromadb/onnxruntime/clientes de
+# embeddings) se importan dentro de los métodos que los usan: la validación por regex no los necesita.
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_core.documents import Document
 
 logger = logging.getLogger(__name__)
 
+# NumPy (opcional): validación vectorizada de dígitos verificadores
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# orjson (opcional): serialización JSON en C para exportar reportes
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Numba (opcional): kernel compilado para los dígitos verificadores en bloque. Sólo se
+# comprueba que esté instalado; se importa y compila en el primer lote (ver _cedula_checks_jit)
+NUMBA_AVAILABLE = NUMPY_AVAILABLE and importlib.util.find_spec("numba") is not None
+
+# Hyperscan (opcional): escanea todas las reglas de cumplimiento en una sola pasada
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    hyperscan = None
+    HYPERSCAN_AVAILABLE = False
+
+# pyahocorasick (opcional): búsqueda simultánea de listas de palabras clave
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+@lru_cache(maxsize=None)
+def _cached_embeddings_provider(provider: str, model: Optional[str]):
+    """get_embeddings_provider memoizado: todos los agentes del proceso comparten el mismo cliente."""
+    from ..embedding import get_embeddings_provider
+    return get_embeddings_provider(provider=provider, model=model)
+
+
+def _json_bytes(data: Any, indent: bool = True) -> bytes:
+    """JSON UTF-8 (sin escapar acentos) con orjson; json estándar si no está o no admite algún tipo."""
+    if ORJSON_AVAILABLE:
+        try:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def _rules_by_category(compliance_rules: Dict[str, Dict[str, Any]]) -> List[Tuple[str, str, Tuple[Tuple[int, str], ...]]]:
+    """(categoría, descripción, ((rule_id, patrón), ...)) con rule_id correlativo entre categorías."""
+    grouped = []
+    rule_id = 0
+    for category, info in compliance_rules.items():
+        rules = tuple(enumerate(info['rules'], start=rule_id))
+        rule_id += len(rules)
+        grouped.append((category, info['description'], rules))
+    return grouped
+
+
+def _build_keyword_automaton(keywords: List[str]):
+    """Construye un autómata Aho-Corasick (keyword en minúsculas -> índice en la lista)."""
+    if not AHOCORASICK_AVAILABLE or not keywords:
+        return None
+    automaton = ahocorasick.Automaton()
+    for i, keyword in enumerate(keywords):
+        automaton.add_word(keyword.lower(), i)
+    automaton.make_automaton()
+    return automaton
+
+
+def _find_keywords(automaton, keywords_lower: Tuple[str, ...], text: str) -> set:
+    """Índices de las keywords (ya en minúsculas) presentes en `text`, en una sola pasada."""
+    if automaton is None:
+        return {i for i, keyword in enumerate(keywords_lower) if keyword in text}
+    return {i for _, i in automaton.iter(text)}
+
+
+# Clase de caracteres simple (sin rangos ni escapes), p. ej. [óo]
+_SIMPLE_CLASS_RE = re.compile(r'\[([^\]\\-]+)\]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _literal_variants(pattern: str) -> Optional[List[str]]:
+    """
+    Expande un patrón "casi literal" (palabras separadas por \\s+ y clases como [óo]) a
+    todas sus frases literales, con un espacio entre palabras. None si el patrón no es literal.
+    """
+    words = []
+    for token in pattern.split(r'\s+'):
+        parts = _SIMPLE_CLASS_RE.split(token)  # posiciones pares: texto; impares: clases
+        if not token or any(re.escape(text) != text for text in parts[::2]):
+            return None
+        options = [[part] if i % 2 == 0 else list(part) for i, part in enumerate(parts)]
+        words.append([''.join(chars) for chars in product(*options)])
+    return [' '.join(combo) for combo in product(*words)]
+
+
+# Fragmentos no literales de un patrón: escapes de clase, clases, cuantificadores y metacaracteres
+_REGEX_TOKEN_RE = re.compile(r'\\[sdwSDWb][+*?]?|\[[^\]]*\][+*?]?|\{[^}]*\}|[.+*?^$]')
+
+
+def _literal_anchor(pattern: str) -> str:
+    """
+    Subcadena literal más larga que toda coincidencia de `pattern` debe contener ('' si no hay una
+    segura). Sirve de filtro negativo barato (`in`) antes de ejecutar la regex.
+    """
+    if any(ch in pattern for ch in '|()?*'):
+        return ''
+    anchor = max(_REGEX_TOKEN_RE.split(pattern), key=len)
+    return '' if '\\' in anchor else anchor
+
+
+def _as_text(content: Union[str, bytes, bytearray, memoryview]) -> str:
+    """Contenido como str: bytes UTF-8 se decodifican una vez y siguen el mismo camino que el texto."""
+    if isinstance(content, str):
+        return content
+    return bytes(content).decode('utf-8', errors='replace')
+
+
+# Suma de dígitos de d*2 para d en 0..9 (módulo 10 de la cédula)
+_DIGIT_TIMES_2_SUM = bytes((d * 2) // 10 + (d * 2) % 10 for d in range(10))
+
+
+def _cedula_checks_kernel(digits, out):
+    """Para cada fila de `digits` (matriz n x 10 de dígitos) escribe en out[i] si el verificador es correcto."""
+    for i in range(digits.shape[0]):
+        total = 0
+        for j in range(9):
+            value = digits[i, j] * (2 - j % 2)
+            total += value - 9 if value >= 10 else value
+        out[i] = (10 - total % 10) % 10 == digits[i, 9]
+
+
+@lru_cache(maxsize=1)
+def _cedula_checks_jit():
+    """Kernel Numba compilado en el primer uso (no al importar el módulo); None si no hay Numba."""
+    if not NUMBA_AVAILABLE:
+        return None
+    try:
+        import numba
+        return numba.njit(cache=True)(_cedula_checks_kernel)
+    except Exception as e:
+        logger.warning(f"No se pudo compilar el kernel Numba de cédulas, se usará NumPy: {e}")
+        return None
+
+
+def _stripped_slice(text: str, start: int, end: int) -> str:
+    """Equivale a text[start:end].strip() pero recorta los límites antes de copiar (una sola copia)."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return text[start:end]
+
+
+def _count_matches(patterns, content, sample_size: int) -> Tuple[int, list]:
+    """
+    Cuenta las coincidencias de todos los patrones (como len(findall) acumulado) y guarda solo
+    las primeras `sample_size`, con el mismo formato que findall (grupo 1 o tupla de grupos).
+    """
+    count = 0
+    sample: list = []
+    for cre in patterns:
+        for match in cre.finditer(content):
+            count += 1
+            if len(sample) < sample_size:
+                sample.append(match.group(1) if cre.groups == 1 else match.groups(''))
+    return count, sample
+
 
 class ComplianceValidationAgent:
     """
@@ -84,6 +270,92 @@ class ComplianceValidationAgent:
         }
     }
 
+    # Fallback por keywords para secciones de propuestas no detectadas por el sectioner
+    PROPOSAL_SECTION_KEYWORDS = {
+        "PROPUESTA_TECNICA": ["propuesta técnica", "alcance técnico", "metodología"],
+        "PROPUESTA_ECONOMICA": ["propuesta económica", "precio", "valor ofertado", "presupuesto"],
+        "EXPERIENCIA": ["experiencia", "antecedentes", "contratos ejecutados"],
+        "CERTIFICACIONES": ["certificaciones", "certificados", "iso", "acreditación"],
+        "PLAN_TRABAJO": ["plan de trabajo", "cronograma de actividades", "actividades", "entregables"],
+    }
+
+    # Índice plano (categoría, patrón) y regex precompilados, en el mismo orden que COMPLIANCE_RULES
+    _COMPLIANCE_INDEX: List[Tuple[str, str]] = [
+        (category, pattern)
+        for category, info in COMPLIANCE_RULES.items()
+        for pattern in info['rules']
+    ]
+    # Se buscan sobre el contenido ya en minúsculas (patrones en minúsculas, sin IGNORECASE)
+    _COMPILED_COMPLIANCE_RULES = [re.compile(pattern, re.UNICODE) for _, pattern in _COMPLIANCE_INDEX]
+    # Reglas literales como frases para Aho-Corasick (sobre contenido con espacios colapsados);
+    # las que no son literales (p. ej. 'ley\s+\d+...') siguen por regex
+    _COMPLIANCE_VARIANTS = [_literal_variants(pattern) for _, pattern in _COMPLIANCE_INDEX]
+    _COMPLIANCE_LITERALS = tuple(phrase for variants in _COMPLIANCE_VARIANTS if variants for phrase in variants)
+    _COMPLIANCE_LITERAL_IDS = tuple(i for i, variants in enumerate(_COMPLIANCE_VARIANTS) if variants for _ in variants)
+    _COMPLIANCE_LITERAL_RULES = len(set(_COMPLIANCE_LITERAL_IDS))
+    _COMPLIANCE_REGEX_IDS = tuple(i for i, variants in enumerate(_COMPLIANCE_VARIANTS) if variants is None)
+    _COMPLIANCE_AC = _build_keyword_automaton(list(_COMPLIANCE_LITERALS))
+    # Literal obligatorio de cada regla (p. ej. 'resoluci'): si no aparece, la regex no puede coincidir
+    _COMPLIANCE_ANCHORS = tuple(_literal_anchor(pattern) for _, pattern in _COMPLIANCE_INDEX)
+    # Reglas agrupadas por categoría con su índice global, y total fijo de reglas
+    _COMPLIANCE_CATEGORY_RULES = _rules_by_category(COMPLIANCE_RULES)
+    _COMPLIANCE_TOTAL_RULES = len(_COMPLIANCE_INDEX)
+    # Consultas semánticas fijas (una por categoría) precalculadas al cargar la base vectorial
+    _RULE_QUERIES = [info['description'] for info in COMPLIANCE_RULES.values()]
+
+    # Patrones de fechas y plazos
+    DATE_PATTERNS = [
+        r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})',
+        r'(\d{4}[\/\-]\d{1,2}[\/\-]\d{1,2})',
+        r'(\d{1,2}\s+de\s+\w+\s+de\s+\d{4})'
+    ]
+    DEADLINE_PATTERNS = [
+        r'plazo[^.]{0,50}(\d+)\s*(d[íi]as?|meses?|a[ñn]os?)',
+        r'fecha[^.]{0,30}(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})',
+        r'vencimiento[^.]{0,30}(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})'
+    ]
+    _DATE_RES = [re.compile(p, re.IGNORECASE) for p in DATE_PATTERNS]
+    _DEADLINE_RES = [re.compile(p, re.IGNORECASE) for p in DEADLINE_PATTERNS]
+
+    # Fechas que cuentan como "presentes" en la validación de estructura
+    STRUCTURE_DATE_PATTERNS = [
+        r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',
+        r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',
+        r'\b\d{4}/\d{1,2}/\d{1,2}\b',
+        r'\b\d{1,2}\s+de\s+\w+\s+de\s+\d{4}\b'
+    ]
+    # Una sola alternancia: basta saber si aparece alguna, y search se detiene en la primera
+    _STRUCTURE_DATE_ANY_RE = re.compile('|'.join(f'(?:{p})' for p in STRUCTURE_DATE_PATTERNS), re.IGNORECASE)
+
+    # Secciones requeridas por tipo de documento (labels del sectioner semántico)
+    REQUIRED_SECTIONS = {
+        'RFP': (
+            "CONVOCATORIA",
+            "OBJETO",
+            "CONDICIONES_GENERALES",
+            "REQUISITOS_TECNICOS",
+            "CONDICIONES_ECONOMICAS",
+            "GARANTIAS",
+            "PLAZOS",
+            "FORMULARIOS",
+        ),
+        # PROPOSAL u otros: el sectioner quizá no devuelva estos labels exactos; usamos alias + keywords
+        'PROPOSAL': (
+            "PROPUESTA_TECNICA",
+            "PROPUESTA_ECONOMICA",
+            "EXPERIENCIA",
+            "CERTIFICACIONES",
+            "PLAN_TRABAJO",
+        ),
+    }
+
+    # Alias para mapear labels del sectioner a los esperados por el validador
+    SECTION_ALIASES = {
+        "CRONOGRAMA": "PLAZOS",
+        "ESPECIFICACIONES_TECNICAS": "REQUISITOS_TECNICOS",
+        "CONDICIONES": "CONDICIONES_GENERALES",
+    }
+
     # Patrones de RUC/NIT por país
     RUC_PATTERNS = {
         'ECUADOR': {
@@ -105,6 +377,11 @@ class ComplianceValidationAgent:
             'headers': {}
         }
     }
+    _RUC_RES = {country: re.compile(cfg['pattern'], re.IGNORECASE) for country, cfg in RUC_PATTERNS.items()}
+
+    # Coeficientes del módulo 10 para los 9 primeros dígitos de la cédula
+    _CEDULA_COEFFICIENTS = [2, 1, 2, 1, 2, 1, 2, 1, 2]
+    _CEDULA_COEFFICIENTS_NP = np.array(_CEDULA_COEFFICIENTS, dtype=np.uint8) if NUMPY_AVAILABLE else None
 
     # Tipos de empresa y compatibilidad
     ENTITY_TYPES = {
@@ -139,6 +416,58 @@ class ComplianceValidationAgent:
         }
     }
 
+    # Autómatas de actividades y calificaciones por tipo de trabajo
+    _ACTIVITY_AUTOMATA = {
+        work_type: _build_keyword_automaton(cfg['compatible_activities'])
+        for work_type, cfg in ENTITY_TYPES.items()
+    }
+    _QUALIFICATION_AUTOMATA = {
+        work_type: _build_keyword_automaton(cfg['required_qualifications'])
+        for work_type, cfg in ENTITY_TYPES.items()
+    }
+
+    # Un solo autómata con todas las frases del fallback de PROPOSAL (frase -> sección)
+    _PROPOSAL_SECTIONS = [
+        section for section, phrases in PROPOSAL_SECTION_KEYWORDS.items() for _ in phrases
+    ]
+    _PROPOSAL_PHRASES = tuple(
+        phrase for phrases in PROPOSAL_SECTION_KEYWORDS.values() for phrase in phrases
+    )
+    _PROPOSAL_AC = _build_keyword_automaton(list(_PROPOSAL_PHRASES))
+
+    # Listas en minúsculas precalculadas y códigos CIIU indexados por longitud de prefijo
+    _ACTIVITIES_LOWER = {
+        work_type: tuple(a.lower() for a in cfg['compatible_activities'])
+        for work_type, cfg in ENTITY_TYPES.items()
+    }
+    _QUALIFICATIONS_LOWER = {
+        work_type: tuple(q.lower() for q in cfg['required_qualifications'])
+        for work_type, cfg in ENTITY_TYPES.items()
+    }
+    _CIIU_PREFIXES = {
+        work_type: (
+            {code: i for i, code in enumerate(cfg['ciiu_codes'])},
+            tuple(sorted({len(code) for code in cfg['ciiu_codes']}))
+        )
+        for work_type, cfg in ENTITY_TYPES.items()
+    }
+
+    # Documentos más largos que el umbral se seccionan solo sobre su inicio y su final
+    SEMANTIC_SAMPLE_THRESHOLD = 30_000
+    SEMANTIC_SAMPLE_EDGE = 15_000
+    _SEMANTIC_SAMPLE_SEPARATOR = "\n...\n"
+
+    # Máximo de resultados memoizados por hash de contenido
+    RESULT_CACHE_SIZE = 128
+    # Documentos por lote al embeber e insertar en la base vectorial
+    VECTOR_DB_BATCH_SIZE = 256
+    # Extensiones que validate_document lee directamente como texto en vez de pasar por el extractor
+    PLAIN_TEXT_SUFFIXES = ('.txt',)
+    # Mínimo de documentos para que validate_multiple_documents(parallel=True) use procesos
+    PARALLEL_MIN_DOCUMENTS = 4
+    # RUCs por lote al validar cédulas en bloque dentro de un documento
+    RUC_BATCH_SIZE = 256
+
     # --------------------------
     # Inicialización
     # --------------------------
@@ -148,19 +477,62 @@ class ComplianceValidationAgent:
         self.embeddings_provider = None
         self._emb_provider = None
         self._emb_model = None
-        self.vector_db = None
+        self.vector_db: Optional["Chroma"] = None
         self.validation_results: Dict[str, Any] = {}
         self.compliance_issues: List[str] = []
+        self._query_cache: Dict[str, List[Tuple["Document", float]]] = {}
+        self._result_cache: "OrderedDict[Tuple[str, bytes, str], Dict[str, Any]]" = OrderedDict()
+        # El agente se comparte entre hilos (etapas en paralelo de BiddingAnalysisSystem)
+        self._result_cache_lock = threading.Lock()
+        self._hs_db = self._build_compliance_scanner()
+        self._extractor = None
         logger.info(f"ComplianceValidationAgent iniciado con DB: {self.vector_db_path}")
 
+    def _get_extractor(self):
+        """DocumentExtractionAgent reutilizado entre documentos (se importa y crea una sola vez)."""
+        if self._extractor is None:
+            # Ajusta el import a tu estructura real
+            from .document_extraction import DocumentExtractionAgent  # type: ignore
+            self._extractor = DocumentExtractionAgent()
+        return self._extractor
+
+    def _read_text_file(self, path: Path) -> Optional[str]:
+        """
+        Lee un archivo de texto UTF-8 (decodificado una sola vez). Devuelve None si no se puede
+        leer o no es UTF-8 válido: el llamador usa entonces el extractor.
+        """
+        try:
+            return path.read_bytes().decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"No se pudo leer {path} como texto UTF-8, se usará el extractor: {e}")
+            return None
+
+    def _build_compliance_scanner(self):
+        """Compila todas las reglas en una base Hyperscan (None si no está disponible)."""
+        if not HYPERSCAN_AVAILABLE:
+            return None
+        try:
+            db = hyperscan.Database()
+            flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 |
+                     hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH)
+            db.compile(
+                expressions=[pattern.encode("utf-8") for _, pattern in self._COMPLIANCE_INDEX],
+                ids=list(range(len(self._COMPLIANCE_INDEX))),
+                flags=[flags] * len(self._COMPLIANCE_INDEX),
+            )
+            return db
+        except Exception as e:
+            logger.warning(f"No se pudo compilar Hyperscan, se usará re: {e}")
+            return None
+
     def initialize_embeddings(self, provider: str = "auto", model: Optional[str] = None) -> bool:
         """Inicializa el sistema de embeddings para validación semántica."""
         if not self.use_embeddings:
             return True
         try:
             # get_embeddings_provider ahora devuelve (embeddings, provider, model)
-            self.embeddings_provider, self._emb_provider, self._emb_model = get_embeddings_provider(
-                provider=provider, model=model
+            self.embeddings_provider, self._emb_provider, self._emb_model = _cached_embeddings_provider(
+                provider, model
             )
             logger.info(f"Sistema de embeddings inicializado para validación ({self._emb_provider}/{self._emb_model})")
             return True
@@ -168,11 +540,13 @@ class ComplianceValidationAgent:
             logger.error(f"Error inicializando embeddings: {e}")
             return False
 
-    def setup_vector_db(self, documents: List[Document]) -> bool:
+    def setup_vector_db(self, documents: List["Document"]) -> bool:
         """Configura la base de datos vectorial y evita duplicados con IDs estables."""
         if not self.use_embeddings or not self.embeddings_provider:
             return True
         try:
+            from langchain_chroma import Chroma
+
             Path(self.vector_db_path).mkdir(parents=True, exist_ok=True)
             self.vector_db = Chroma(
                 collection_name="compliance_validation",
@@ -183,36 +557,136 @@ class ComplianceValidationAgent:
                 ids: List[str] = []
                 for i, d in enumerate(documents):
                     src = (d.metadata or {}).get("source", f"doc_{i}")
-                    raw = (src + "|" + d.page_content).encode("utf-8")
-                    ids.append(hashlib.sha1(raw).hexdigest())  # estable entre ejecuciones
-                self.vector_db.add_documents(documents, ids=ids)
+                    # sha1(src|contenido) incremental, sin concatenar la página completa
+                    h = hashlib.sha1(src.encode("utf-8"))
+                    h.update(b"|")
+                    h.update(d.page_content.encode("utf-8"))
+                    ids.append(h.hexdigest())  # estable entre ejecuciones
+                # Embeber cada lote en una sola llamada al modelo e insertarlo de una vez
+                batch_size = self.VECTOR_DB_BATCH_SIZE
+                for start in range(0, len(documents), batch_size):
+                    self._upsert_batch(ids[start:start + batch_size], documents[start:start + batch_size])
                 # persist() es no-op en Chroma moderno, pero no molesta
                 try:
                     self.vector_db.persist()
                 except AttributeError:
                     pass
                 logger.info(f"Base de datos vectorial configurada con {len(documents)} documentos")
+            # Los vecinos cambian con cada carga: recalcular las consultas fijas por categoría
+            self._query_cache = {}
+            self.semantic_compliance_check_batch(self._RULE_QUERIES)
             return True
         except Exception as e:
             logger.error(f"Error configurando base de datos vectorial: {e}")
             return False
 
+    def _upsert_batch(self, ids: List[str], documents: List["Document"]) -> None:
+        """
+        Embebe e inserta (upsert) un lote en la colección. Los IDs que ya están en la colección
+        (el mismo contenido de una carga anterior) no se vuelven a embeber.
+        """
+        collection = self.vector_db._collection
+        existing = set(collection.get(ids=ids, include=[])["ids"])
+        pending: Dict[str, "Document"] = {}
+        for doc_id, d in zip(ids, documents):
+            if doc_id not in existing:
+                pending.setdefault(doc_id, d)
+        if not pending:
+            return
+
+        pending_ids = list(pending)
+        pending_docs = list(pending.values())
+        embeddings = self.embeddings_provider.embed_documents([d.page_content for d in pending_docs])
+        # Chroma no admite metadatos vacíos: los documentos sin metadatos van en su propia llamada
+        for has_metadata in (True, False):
+            idx = [k for k, d in enumerate(pending_docs) if bool(d.metadata) == has_metadata]
+            if not idx:
+                continue
+            collection.upsert(
+                ids=[pending_ids[k] for k in idx],
+                documents=[pending_docs[k].page_content for k in idx],
+                embeddings=[embeddings[k] for k in idx],
+                **({"metadatas": [pending_docs[k].metadata for k in idx]} if has_metadata else {}),
+            )
+
+    # --------------------------
+    # Cache de resultados (LRU por hash de contenido)
+    # --------------------------
+    def _cache_key(self, kind: str, content: str, document_type: str = "") -> Tuple[str, bytes, str]:
+        return (kind, hashlib.sha1(content.encode("utf-8")).digest(), document_type)
+
+    def _cache_get(self, key: Tuple[str, bytes, str]) -> Optional[Dict[str, Any]]:
+        with self._result_cache_lock:
+            result = self._result_cache.get(key)
+            if result is None:
+                return None
+            self._result_cache.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def _cache_put(self, key: Tuple[str, bytes, str], result: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = copy.deepcopy(result)
+        with self._result_cache_lock:
+            self._result_cache[key] = snapshot
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _prep_content(content: str) -> Tuple[str, str]:
+        """Devuelve (content, content.lower()) para compartir la copia en minúsculas entre validaciones."""
+        return content, content.lower()
+
+    def _detect_sections_sampled(self, content: str, detector) -> List[Tuple[int, str, float]]:
+        """
+        Ejecuta el sectioner semántico sobre el documento completo o, si es muy largo,
+        sobre sus primeros y últimos SEMANTIC_SAMPLE_EDGE caracteres (portada, índice,
+        secciones iniciales y formularios finales). Los offsets se devuelven sobre `content`.
+        """
+        edge = self.SEMANTIC_SAMPLE_EDGE
+        if len(content) < self.SEMANTIC_SAMPLE_THRESHOLD:
+            return detector(content)
+
+        separator = self._SEMANTIC_SAMPLE_SEPARATOR
+        tail_start_sample = edge + len(separator)
+        tail_start_content = len(content) - edge
+        sample = content[:edge] + separator + content[-edge:]
+
+        boundaries = []
+        for start, label, conf in detector(sample):
+            if start >= tail_start_sample:
+                start = start - tail_start_sample + tail_start_content
+            elif start >= edge:
+                start = tail_start_content
+            boundaries.append((start, label, conf))
+        return boundaries
+
     # --------------------------
     # Validaciones principales
     # --------------------------
-    def validate_document_structure(self, content: str, document_type: str = "RFP") -> Dict[str, Any]:
+    def validate_document_structure(self, content: str, document_type: str = "RFP",
+                                    content_lower: Optional[str] = None) -> Dict[str, Any]:
         """
         Valida la estructura del documento usando el **sectioner semántico**
         (sin regex para detección de secciones).
         """
+        cache_key = self._cache_key("structure", content, document_type)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         SECTION_CONF_THRESHOLD = 0.30  # umbral mínimo para considerar que una sección existe
 
         # 1) Detectar límites y labels con el sectioner semántico (embedding.py)
+        sectioner_ok = True
         try:
-            boundaries = detect_section_boundaries_semantic(content)
+            from ..embedding import detect_section_boundaries_semantic
+
+            boundaries = self._detect_sections_sampled(content, detect_section_boundaries_semantic)
         except Exception as e:
             logger.warning(f"No se pudo ejecutar el sectioner semántico: {e}")
             boundaries = []
+            sectioner_ok = False
 
         # 2) Consolidar secciones detectadas (label -> max_conf) y filtrar ruido
         detected: Dict[str, float] = {}
@@ -224,33 +698,11 @@ class ComplianceValidationAgent:
             detected[label.upper()] = max(conf, detected.get(label.upper(), 0.0))
 
         # 3) Definir requeridas por tipo
-        if document_type.upper() == "RFP":
-            required_labels = [
-                "CONVOCATORIA",
-                "OBJETO",
-                "CONDICIONES_GENERALES",
-                "REQUISITOS_TECNICOS",
-                "CONDICIONES_ECONOMICAS",
-                "GARANTIAS",
-                "PLAZOS",
-                "FORMULARIOS",
-            ]
-        else:  # PROPOSAL u otros
-            # El sectioner quizá no devuelva estos labels exactos; usamos alias + keywords
-            required_labels = [
-                "PROPUESTA_TECNICA",
-                "PROPUESTA_ECONOMICA",
-                "EXPERIENCIA",
-                "CERTIFICACIONES",
-                "PLAN_TRABAJO",
-            ]
+        is_rfp = document_type.upper() == "RFP"
+        required_labels = self.REQUIRED_SECTIONS['RFP' if is_rfp else 'PROPOSAL']
 
         # 4) Alias para mapear labels del sectioner a los esperados por el validador
-        alias_map = {
-            "CRONOGRAMA": "PLAZOS",
-            "ESPECIFICACIONES_TECNICAS": "REQUISITOS_TECNICOS",
-            "CONDICIONES": "CONDICIONES_GENERALES",
-        }
+        alias_map = self.SECTION_ALIASES
         detected_norm = {}
         for k, v in detected.items():
             detected_norm[alias_map.get(k, k)] = max(v, detected_norm.get(alias_map.get(k, k), 0.0))
@@ -260,19 +712,15 @@ class ComplianceValidationAgent:
         missing = [sec for sec in required_labels if sec not in found]
 
         # 5b) Para PROPOSAL, fallback liviano por keywords si el sectioner no cubre
-        if document_type.upper() != "RFP" and missing:
-            lc = content.lower()
-            kw = {
-                "PROPUESTA_TECNICA": ["propuesta técnica", "alcance técnico", "metodología"],
-                "PROPUESTA_ECONOMICA": ["propuesta económica", "precio", "valor ofertado", "presupuesto"],
-                "EXPERIENCIA": ["experiencia", "antecedentes", "contratos ejecutados"],
-                "CERTIFICACIONES": ["certificaciones", "certificados", "iso", "acreditación"],
-                "PLAN_TRABAJO": ["plan de trabajo", "cronograma de actividades", "actividades", "entregables"],
+        if not is_rfp and missing:
+            lc = content_lower if content_lower is not None else content.lower()
+            # Una pasada sobre el contenido resuelve todas las frases de todas las secciones
+            matched_secs = {
+                self._PROPOSAL_SECTIONS[i]
+                for i in _find_keywords(self._PROPOSAL_AC, self._PROPOSAL_PHRASES, lc)
             }
-            for sec in list(missing):
-                if any(k in lc for k in kw.get(sec, [])):
-                    found.append(sec)
-                    missing.remove(sec)
+            found.extend(sec for sec in missing if sec in matched_secs)
+            missing = [sec for sec in missing if sec not in matched_secs]
 
         structural_issues: List[str] = []
         # Longitud mínima
@@ -280,17 +728,11 @@ class ComplianceValidationAgent:
             structural_issues.append("Documento demasiado corto (< 1000 caracteres)")
 
         # Presencia de fechas (esto sí con regex porque es puntual)
-        date_patterns = [
-            r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',
-            r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',
-            r'\b\d{4}/\d{1,2}/\d{1,2}\b',
-            r'\b\d{1,2}\s+de\s+\w+\s+de\s+\d{4}\b'
-        ]
-        has_dates = any(re.search(p, content, re.IGNORECASE) for p in date_patterns)
+        has_dates = self._STRUCTURE_DATE_ANY_RE.search(content) is not None
         if not has_dates:
             structural_issues.append("No se encontraron fechas en el documento")
 
-        return {
+        result = {
             "document_type": document_type,
             "total_sections_required": len(required_labels),
             "sections_found": len(found),
@@ -302,34 +744,81 @@ class ComplianceValidationAgent:
             "has_adequate_length": len(content.strip()) >= 1000,
             "has_dates": has_dates
         }
+        # Un resultado degradado (sin sectioner) no se guarda: el próximo intento vuelve a probar
+        return self._cache_put(cache_key, result) if sectioner_ok else result
+
+    def _match_compliance_rules(self, content: str) -> set:
+        """
+        Devuelve los índices (en _COMPLIANCE_INDEX) de las reglas presentes en el contenido,
+        que debe venir ya en minúsculas.
+        """
+        if self._hs_db is not None:
+            matched_ids: set = set()
+
+            def on_match(rule_id, start, end, flags, context):
+                matched_ids.add(rule_id)
 
-    def validate_compliance_rules(self, content: str) -> Dict[str, Any]:
-        """Valida cumplimiento con reglas predefinidas basadas en regex."""
+            try:
+                self._hs_db.scan(content.encode("utf-8"), match_event_handler=on_match)
+                return matched_ids
+            except Exception as e:
+                logger.warning(f"Error escaneando con Hyperscan, se usará re: {e}")
+
+        compiled = self._COMPILED_COMPLIANCE_RULES
+        anchors = self._COMPLIANCE_ANCHORS
+        if self._COMPLIANCE_AC is not None:
+            # Una pasada Aho-Corasick resuelve las reglas literales; \s+ equivale a un espacio
+            collapsed = _WHITESPACE_RE.sub(' ', content)
+            literal_ids = self._COMPLIANCE_LITERAL_IDS
+            matched: set = set()
+            for _, i in self._COMPLIANCE_AC.iter(collapsed):
+                matched.add(literal_ids[i])
+                # Todas las reglas literales ya aparecieron: el resto del texto no aporta
+                if len(matched) == self._COMPLIANCE_LITERAL_RULES:
+                    break
+            matched.update(
+                i for i in self._COMPLIANCE_REGEX_IDS
+                if anchors[i] in content and compiled[i].search(content)
+            )
+            return matched
+
+        # Sin Hyperscan se busca patrón por patrón: cada regex conserva el salto por prefijo
+        # literal de `re`, mientras que una alternancia con todas las reglas lo pierde y resulta
+        # varias veces más lenta (además de ocultar coincidencias que se solapan).
+        return {i for i, cre in enumerate(compiled) if anchors[i] in content and cre.search(content)}
+
+    def validate_compliance_rules(self, content: Union[str, bytes], content_lower: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Valida cumplimiento con reglas predefinidas basadas en regex.
+        Acepta también bytes UTF-8, que se decodifican y se validan igual que el texto.
+        """
+        content = _as_text(content)
+        cache_key = self._cache_key("compliance", content)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        matched_ids = self._match_compliance_rules(
+            content_lower if content_lower is not None else content.lower()
+        )
+        return self._cache_put(cache_key, self._compliance_report(matched_ids))
+
+    def _compliance_report(self, matched_ids: set) -> Dict[str, Any]:
+        """Arma el reporte de cumplimiento por categoría a partir de los índices de reglas presentes."""
         compliance_results: Dict[str, Any] = {}
-        total_rules = 0
+        total_rules = self._COMPLIANCE_TOTAL_RULES
         passed_rules = 0
-
-        for rule_category, rule_info in self.COMPLIANCE_RULES.items():
-            category_results = {
-                "description": rule_info["description"],
-                "rules_checked": len(rule_info["rules"]),
-                "rules_passed": 0,
-                "missing_rules": [],
-                "found_rules": []
+        for rule_category, description, rules in self._COMPLIANCE_CATEGORY_RULES:
+            found_rules = [pattern for rule_id, pattern in rules if rule_id in matched_ids]
+            passed_rules += len(found_rules)
+            compliance_results[rule_category] = {
+                "description": description,
+                "rules_checked": len(rules),
+                "rules_passed": len(found_rules),
+                "missing_rules": [pattern for rule_id, pattern in rules if rule_id not in matched_ids],
+                "found_rules": found_rules,
+                "compliance_percentage": len(found_rules) / len(rules) * 100
             }
-            for rule_pattern in rule_info["rules"]:
-                total_rules += 1
-                if re.search(rule_pattern, content, re.IGNORECASE | re.UNICODE):
-                    category_results["rules_passed"] += 1
-                    category_results["found_rules"].append(rule_pattern)
-                    passed_rules += 1
-                else:
-                    category_results["missing_rules"].append(rule_pattern)
-
-            category_results["compliance_percentage"] = (
-                category_results["rules_passed"] / category_results["rules_checked"] * 100
-            )
-            compliance_results[rule_category] = category_results
 
         overall_compliance = (passed_rules / total_rules * 100) if total_rules > 0 else 0
 
@@ -342,42 +831,28 @@ class ComplianceValidationAgent:
             "compliance_level": self._get_compliance_level(overall_compliance)
         }
 
-    def validate_dates_and_deadlines(self, content: str) -> Dict[str, Any]:
-        """Valida fechas y plazos en el documento."""
-        date_patterns = [
-            r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})',
-            r'(\d{4}[\/\-]\d{1,2}[\/\-]\d{1,2})',
-            r'(\d{1,2}\s+de\s+\w+\s+de\s+\d{4})'
-        ]
-        found_dates: List[str] = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            found_dates.extend(matches)
-
-        deadline_patterns = [
-            r'plazo[^.]{0,50}(\d+)\s*(d[íi]as?|meses?|a[ñn]os?)',
-            r'fecha[^.]{0,30}(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})',
-            r'vencimiento[^.]{0,30}(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})'
-        ]
-        found_deadlines: List[str] = []
-        for pattern in deadline_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            found_deadlines.extend(matches)
+    def validate_dates_and_deadlines(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        """Valida fechas y plazos en el documento (str, o bytes UTF-8 que se decodifican)."""
+        content = _as_text(content)
+        date_res, deadline_res = self._DATE_RES, self._DEADLINE_RES
+
+        dates_found, sample_dates = _count_matches(date_res, content, 5)
+        deadlines_found, sample_deadlines = _count_matches(deadline_res, content, 5)
 
         date_issues: List[str] = []
-        if len(found_dates) < 2:
+        if dates_found < 2:
             date_issues.append("Pocas fechas encontradas en el documento")
 
         return {
-            "dates_found": len(found_dates),
-            "deadlines_found": len(found_deadlines),
-            "sample_dates": found_dates[:5],
-            "sample_deadlines": found_deadlines[:5],
+            "dates_found": dates_found,
+            "deadlines_found": deadlines_found,
+            "sample_dates": sample_dates,
+            "sample_deadlines": sample_deadlines,
             "date_issues": date_issues,
-            "has_adequate_dates": len(found_dates) >= 3
+            "has_adequate_dates": dates_found >= 3
         }
 
-    def semantic_compliance_check(self, query: str, threshold: float = 0.3) -> List[Tuple[Document, float]]:
+    def semantic_compliance_check(self, query: str, threshold: float = 0.3) -> List[Tuple["Document", float]]:
         """
         Validación semántica con búsqueda por vectores.
         NOTA: Chroma devuelve distancia (menor es más similar).
@@ -385,6 +860,8 @@ class ComplianceValidationAgent:
         if not self.vector_db:
             logger.warning("Base de datos vectorial no disponible para validación semántica")
             return []
+        if query in self._query_cache:
+            return [(doc, score) for doc, score in self._query_cache[query] if score <= threshold]
         try:
             results = self.vector_db.similarity_search_with_score(query, k=10)
             return [(doc, score) for doc, score in results if score <= threshold]
@@ -392,6 +869,41 @@ class ComplianceValidationAgent:
             logger.error(f"Error en validación semántica: {e}")
             return []
 
+    def semantic_compliance_check_batch(self, queries: List[str], threshold: float = 0.3) -> List[List[Tuple["Document", float]]]:
+        """
+        Versión por lotes de semantic_compliance_check: embebe todas las consultas en una
+        sola llamada y resuelve los vecinos con una única consulta a Chroma.
+        Los resultados (sin filtrar) quedan en cache por texto de consulta.
+        """
+        if not self.vector_db or not self.embeddings_provider:
+            logger.warning("Base de datos vectorial no disponible para validación semántica")
+            return [[] for _ in queries]
+
+        pending = [q for q in dict.fromkeys(queries) if q not in self._query_cache]
+        if pending:
+            try:
+                from langchain_core.documents import Document
+
+                query_vectors = self.embeddings_provider.embed_documents(pending)
+                raw = self.vector_db._collection.query(
+                    query_embeddings=query_vectors,
+                    n_results=10,
+                    include=["documents", "metadatas", "distances"],
+                )
+                for i, query in enumerate(pending):
+                    self._query_cache[query] = [
+                        (Document(page_content=text or "", metadata=meta or {}), dist)
+                        for text, meta, dist in zip(raw["documents"][i], raw["metadatas"][i], raw["distances"][i])
+                    ]
+            except Exception as e:
+                logger.error(f"Error en validación semántica por lotes: {e}")
+                return [[] for _ in queries]
+
+        return [
+            [(doc, score) for doc, score in self._query_cache[query] if score <= threshold]
+            for query in queries
+        ]
+
     # --------------------------
     # Scoring / utilidades
     # --------------------------
@@ -455,33 +967,34 @@ class ComplianceValidationAgent:
     # --------------------------
     # RUC / compatibilidad
     # --------------------------
-    def extract_ruc_from_content(self, content: str) -> List[Dict[str, Any]]:
-        found_rucs: List[Dict[str, Any]] = []
+    def iter_rucs_from_content(self, content: str) -> Iterator[Dict[str, Any]]:
+        """Genera los RUCs encontrados en el contenido, uno por coincidencia (ver validate_ruc_in_document)."""
         for country, config in self.RUC_PATTERNS.items():
-            pattern = config['pattern']
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
+            for match in self._RUC_RES[country].finditer(content):
                 ruc_number = match.group().strip()
                 context_start = max(0, match.start() - 100)
                 context_end = min(len(content), match.end() + 100)
-                context = content[context_start:context_end]
-                found_rucs.append({
+                yield {
                     'ruc_number': ruc_number,
                     'country': country,
                     'position': match.span(),
-                    'context': context.strip(),
+                    'context': _stripped_slice(content, context_start, context_end),
                     'pattern_description': config['description'],
                     'validation_status': 'pending'
-                })
+                }
+
+    def extract_ruc_from_content(self, content: str) -> List[Dict[str, Any]]:
+        found_rucs = list(self.iter_rucs_from_content(content))
         logger.info(f"RUCs encontrados: {len(found_rucs)}")
         return found_rucs
 
-    def validate_ruc_format(self, ruc_number: str, country: str = 'ECUADOR') -> Dict[str, Any]:
+    def validate_ruc_format(self, ruc_number: str, country: str = 'ECUADOR',
+                            check_digit_valid: Optional[bool] = None) -> Dict[str, Any]:
+        """`check_digit_valid`: resultado ya calculado del dígito verificador de la cédula base (Ecuador)."""
         if country not in self.RUC_PATTERNS:
             return {'valid_format': False, 'error': f'País {country} no soportado'}
         config = self.RUC_PATTERNS[country]
-        pattern = config['pattern']
-        if re.match(pattern, ruc_number.strip()):
+        if self._RUC_RES[country].match(ruc_number.strip()):
             validation_result: Dict[str, Any] = {
                 'valid_format': True,
                 'country': country,
@@ -489,7 +1002,7 @@ class ComplianceValidationAgent:
                 'description': config['description']
             }
             if country == 'ECUADOR':
-                ecu = self._validate_ecuador_ruc(ruc_number)
+                ecu = self._validate_ecuador_ruc(ruc_number, check_digit_valid)
                 validation_result.update(ecu)
                 # “Válido” solo si pasó las reglas de EC y sufijo válido
                 validation_result['valid_format'] = (
@@ -500,16 +1013,16 @@ class ComplianceValidationAgent:
             return validation_result
         return {'valid_format': False, 'country': country, 'ruc_number': ruc_number, 'error': f'Formato inválido para {country}'}
 
-    def _validate_ecuador_ruc(self, ruc: str) -> Dict[str, Any]:
+    def _validate_ecuador_ruc(self, ruc: str, check_digit_valid: Optional[bool] = None) -> Dict[str, Any]:
         ruc = ruc.strip()
         if len(ruc) not in [10, 13]:
             return {'ecuador_validation': False, 'error': 'Longitud inválida'}
         if len(ruc) == 10:
             # Cédula sola (no RUC): válida como base, pero sin sufijo
-            return self._validate_ecuador_cedula(ruc)
+            return self._validate_ecuador_cedula(ruc, check_digit_valid)
 
         base_ruc, suffix = ruc[:10], ruc[10:]
-        base_validation = self._validate_ecuador_cedula(base_ruc)
+        base_validation = self._validate_ecuador_cedula(base_ruc, check_digit_valid)
         if not base_validation.get('ecuador_validation', False):
             return base_validation
 
@@ -520,8 +1033,8 @@ class ComplianceValidationAgent:
             entity_type, expected_suffix, valid_suffix = 'entidad_publica', '001', (suffix == '001')
         elif third_digit == 9:
             entity_type, expected_suffix = 'persona_juridica', '001'
-            # Permite matriz 001 o sucursales 002–999
-            valid_suffix = bool(re.fullmatch(r'00[1-9]|0[1-9]\d|[1-9]\d\d', suffix))
+            # Permite matriz 001 o sucursales 002–999 (tres dígitos, distinto de 000)
+            valid_suffix = len(suffix) == 3 and suffix.isascii() and suffix.isdigit() and int(suffix) >= 1
         else:
             return {'ecuador_validation': False, 'error': 'Tercer dígito inválido'}
 
@@ -534,7 +1047,7 @@ class ComplianceValidationAgent:
             'valid_suffix': valid_suffix
         }
 
-    def _validate_ecuador_cedula(self, cedula: str) -> Dict[str, Any]:
+    def _validate_ecuador_cedula(self, cedula: str, check_digit_valid: Optional[bool] = None) -> Dict[str, Any]:
         if len(cedula) != 10:
             return {'ecuador_validation': False, 'error': 'Cédula debe tener 10 dígitos'}
         try:
@@ -542,16 +1055,15 @@ class ComplianceValidationAgent:
             if provincia < 1 or provincia > 24:
                 return {'ecuador_validation': False, 'error': 'Código de provincia inválido'}
 
+            # Resultado precalculado en bloque por validate_ruc_in_document
+            if check_digit_valid:
+                return {'ecuador_validation': True, 'provincia': provincia, 'check_digit_valid': True}
+
             digits = [int(d) for d in cedula]
             check_digit = digits[9]
-            coefficients = [2, 1, 2, 1, 2, 1, 2, 1, 2]
 
-            total = 0
-            for i in range(9):
-                product = digits[i] * coefficients[i]
-                if product >= 10:
-                    product = product // 10 + product % 10
-                total += product
+            # Coeficientes 2,1,2,1,...: posiciones pares por tabla, impares tal cual
+            total = sum(_DIGIT_TIMES_2_SUM[d] for d in digits[0:9:2]) + sum(digits[1:9:2])
 
             expected_check = (10 - (total % 10)) % 10
             if check_digit == expected_check:
@@ -566,6 +1078,29 @@ class ComplianceValidationAgent:
         except ValueError:
             return {'ecuador_validation': False, 'error': 'Cédula contiene caracteres no numéricos'}
 
+    def _validate_cedulas_batch(self, cedulas: List[str]) -> List[bool]:
+        """
+        Verifica el dígito verificador de varias cédulas (10 dígitos ASCII) en una sola
+        operación vectorizada. No valida el código de provincia.
+        """
+        if not cedulas:
+            return []
+        if not NUMPY_AVAILABLE:
+            return [self._validate_ecuador_cedula(c).get('check_digit_valid', False) for c in cedulas]
+
+        arr = np.frombuffer("".join(cedulas).encode("ascii"), dtype=np.uint8).reshape(-1, 10) - ord('0')
+        kernel = _cedula_checks_jit()
+        if kernel is not None:
+            out = np.empty(len(cedulas), dtype=np.bool_)
+            kernel(arr.astype(np.int64), out)
+            return out.tolist()
+
+        prod = arr[:, :9] * self._CEDULA_COEFFICIENTS_NP
+        # Suma de dígitos del producto: como máximo 18, basta restar 9
+        prod = np.where(prod >= 10, prod - 9, prod)
+        expected = (10 - prod.sum(axis=1) % 10) % 10
+        return (expected == arr[:, 9]).tolist()
+
     def validate_entity_compatibility(self, entity_data: Dict[str, Any], work_type: str = 'CONSTRUCCION') -> Dict[str, Any]:
         if work_type not in self.ENTITY_TYPES:
             return {'compatibility_validation': False, 'error': f'Tipo de trabajo {work_type} no reconocido'}
@@ -577,19 +1112,31 @@ class ComplianceValidationAgent:
         entity_activity = (entity_data.get('actividad_economica') or '').lower()
         ciiu_code = entity_data.get('ciiu_code', '')
 
-        for activity in work_config['compatible_activities']:
-            if activity.lower() in entity_activity:
+        activities = work_config['compatible_activities']
+        matched_activities = _find_keywords(
+            self._ACTIVITY_AUTOMATA[work_type], self._ACTIVITIES_LOWER[work_type], entity_activity
+        )
+        for i, activity in enumerate(activities):
+            if i in matched_activities:
                 compatibility_score += 20
                 compatibility_reasons.append(f"Actividad relacionada: {activity}")
 
-        for code in work_config['ciiu_codes']:
-            if ciiu_code.startswith(code):
-                compatibility_score += 30
-                compatibility_reasons.append(f"Código CIIU compatible: {code}")
+        # Prefijos CIIU: un lookup por longitud de código en lugar de recorrer la lista
+        code_index, prefix_lengths = self._CIIU_PREFIXES[work_type]
+        matched_codes = {ciiu_code[:n] for n in prefix_lengths if ciiu_code[:n] in code_index}
+        for code in sorted(matched_codes, key=code_index.get):
+            compatibility_score += 30
+            compatibility_reasons.append(f"Código CIIU compatible: {code}")
 
         entity_qualifications = entity_data.get('qualifications', [])
-        for required_qual in work_config['required_qualifications']:
-            if any(required_qual.lower() in (qual or '').lower() for qual in entity_qualifications):
+        required_quals = work_config['required_qualifications']
+        matched_quals: set = set()
+        for qual in entity_qualifications:
+            matched_quals |= _find_keywords(
+                self._QUALIFICATION_AUTOMATA[work_type], self._QUALIFICATIONS_LOWER[work_type], (qual or '').lower()
+            )
+        for i, required_qual in enumerate(required_quals):
+            if i in matched_quals:
                 compatibility_score += 25
                 compatibility_reasons.append(f"Calificación requerida: {required_qual}")
             else:
@@ -626,10 +1173,11 @@ class ComplianceValidationAgent:
             return f"Entidad con baja compatibilidad. Riesgos: {', '.join(warnings[:3])}" if warnings else \
                    "Entidad con baja compatibilidad."
 
-    def validate_ruc_in_document(self, content: str, work_type: str = 'CONSTRUCCION') -> Dict[str, Any]:
+    def validate_ruc_in_document(self, content: str, work_type: str = 'CONSTRUCCION',
+                                 timestamp: Optional[str] = None) -> Dict[str, Any]:
         logger.info("Iniciando validación de RUC en documento")
         validation_report: Dict[str, Any] = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp or datetime.now().isoformat(),
             'work_type': work_type,
             'rucs_found': [],
             'validation_summary': {
@@ -641,10 +1189,27 @@ class ComplianceValidationAgent:
             'recommendations': []
         }
 
-        found_rucs = self.extract_ruc_from_content(content)
-        validation_report['validation_summary']['total_rucs'] = len(found_rucs)
+        found_rucs = self.iter_rucs_from_content(content)
+        while True:
+            batch = list(islice(found_rucs, self.RUC_BATCH_SIZE))
+            if not batch:
+                break
+            validation_report['validation_summary']['total_rucs'] += len(batch)
+
+            # Dígitos verificadores de las cédulas base de Ecuador del lote en un solo paso
+            cedulas = sorted({
+                r['ruc_number'][:10] for r in batch
+                if r['country'] == 'ECUADOR' and r['ruc_number'].isascii() and r['ruc_number'].isdigit()
+                and len(r['ruc_number']) >= 10
+            })
+            cedula_valid = dict(zip(cedulas, self._validate_cedulas_batch(cedulas)))
+
+            for ruc_data in batch:
+                self._validate_found_ruc(ruc_data, work_type, validation_report, cedula_valid)
 
-        if not found_rucs:
+        total_rucs = validation_report['validation_summary']['total_rucs']
+        logger.info(f"RUCs encontrados: {total_rucs}")
+        if total_rucs == 0:
             validation_report['validation_summary']['critical_issues'].append(
                 "No se encontraron números de RUC en el documento"
             )
@@ -653,51 +1218,53 @@ class ComplianceValidationAgent:
             )
             return validation_report
 
-        for ruc_data in found_rucs:
-            ruc_number = ruc_data['ruc_number']
-            country = ruc_data['country']
-
-            format_validation = self.validate_ruc_format(ruc_number, country)
-            ruc_data['format_validation'] = format_validation
-
-            if format_validation.get('valid_format', False):
-                validation_report['validation_summary']['valid_format'] += 1
-
-                # Por ahora sin datos externos de la entidad
-                entity_data = {
-                    'ruc': ruc_number,
-                    'actividad_economica': '',
-                    'ciiu_code': '',
-                    'qualifications': []
-                }
-                compatibility_validation = self.validate_entity_compatibility(entity_data, work_type)
-                ruc_data['compatibility_validation'] = compatibility_validation
-                if compatibility_validation.get('is_compatible', False):
-                    validation_report['validation_summary']['compatible_entities'] += 1
-            else:
-                validation_report['validation_summary']['critical_issues'].append(
-                    f"RUC {ruc_number}: Formato inválido"
-                )
-
-            validation_report['rucs_found'].append(ruc_data)
-
         validation_report['recommendations'] = self._generate_ruc_validation_recommendations(
             validation_report['validation_summary']
         )
 
-        total_rucs = validation_report['validation_summary']['total_rucs']
-        if total_rucs > 0:
-            format_score = (validation_report['validation_summary']['valid_format'] / total_rucs) * 100
-            compatibility_score = (validation_report['validation_summary']['compatible_entities'] / total_rucs) * 100
-            overall_score = (format_score + compatibility_score) / 2
-        else:
-            overall_score = 0.0
+        format_score = (validation_report['validation_summary']['valid_format'] / total_rucs) * 100
+        compatibility_score = (validation_report['validation_summary']['compatible_entities'] / total_rucs) * 100
+        overall_score = (format_score + compatibility_score) / 2
 
         validation_report['overall_score'] = round(overall_score, 2)
         validation_report['validation_level'] = self._get_validation_level(overall_score)
         logger.info(f"Validación de RUC completada. Score: {overall_score:.1f}%")
         return validation_report
 
+    def _validate_found_ruc(self, ruc_data: Dict[str, Any], work_type: str, validation_report: Dict[str, Any],
+                            cedula_valid: Optional[Dict[str, bool]] = None) -> None:
+        """
+        Valida un RUC extraído y acumula el resultado en el reporte. `cedula_valid` es el
+        dígito verificador ya calculado en bloque por cédula base (ver _validate_cedulas_batch).
+        """
+        ruc_number = ruc_data['ruc_number']
+        country = ruc_data['country']
+
+        check_digit_valid = cedula_valid.get(ruc_number[:10]) if cedula_valid else None
+        format_validation = self.validate_ruc_format(ruc_number, country, check_digit_valid)
+        ruc_data['format_validation'] = format_validation
+
+        if format_validation.get('valid_format', False):
+            validation_report['validation_summary']['valid_format'] += 1
+
+            # Por ahora sin datos externos de la entidad
+            entity_data = {
+                'ruc': ruc_number,
+                'actividad_economica': '',
+                'ciiu_code': '',
+                'qualifications': []
+            }
+            compatibility_validation = self.validate_entity_compatibility(entity_data, work_type)
+            ruc_data['compatibility_validation'] = compatibility_validation
+            if compatibility_validation.get('is_compatible', False):
+                validation_report['validation_summary']['compatible_entities'] += 1
+        else:
+            validation_report['validation_summary']['critical_issues'].append(
+                f"RUC {ruc_number}: Formato inválido"
+            )
+
+        validation_report['rucs_found'].append(ruc_data)
+
     def _generate_ruc_validation_recommendations(self, summary: Dict[str, Any]) -> List[str]:
         recommendations: List[str] = []
         if summary['total_rucs'] == 0:
@@ -713,16 +1280,24 @@ class ComplianceValidationAgent:
     # --------------------------
     # Pipeline principal
     # --------------------------
-    def validate_document(self, document_path: Optional[str] = None, content: Optional[str] = None, document_type: str = "RFP") -> Dict[str, Any]:
+    def validate_document(self, document_path: Optional[str] = None, content: Optional[str] = None, document_type: str = "RFP",
+                          validation_timestamp: Optional[str] = None, content_lower: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Valida un documento completo. `validation_timestamp` permite fijar la marca de tiempo
+        del reporte (p. ej. la misma para todo un lote); por defecto se toma al terminar.
+        `content_lower` (= content.lower()) evita recalcular la copia en minúsculas si el
+        llamador ya la tiene.
+        """
         if not content and not document_path:
             raise ValueError("Debe proporcionar content o document_path")
 
+        # Texto plano (p. ej. el .txt ya extraído): se lee tal cual, sin pasar por el extractor
+        if document_path and not content and Path(document_path).suffix.lower() in self.PLAIN_TEXT_SUFFIXES:
+            content = self._read_text_file(Path(document_path))
+
         if document_path and not content:
             try:
-                # Ajusta el import a tu estructura real
-                from .document_extraction import DocumentExtractionAgent  # type: ignore
-                extractor = DocumentExtractionAgent(document_path)
-                content = extractor.extract_text()
+                content = self._get_extractor().extract_text(document_path)
             except Exception as e:
                 logger.error(f"Error extrayendo contenido de {document_path}: {e}")
                 return {"error": f"No se pudo extraer contenido: {e}"}
@@ -730,11 +1305,13 @@ class ComplianceValidationAgent:
         assert content is not None
         logger.info(f"Iniciando validación de documento tipo {document_type}")
 
-        # Validaciones
-        structural_validation = self.validate_document_structure(content, document_type)
-        compliance_validation = self.validate_compliance_rules(content)
+        # Validaciones (una sola copia en minúsculas compartida)
+        if content_lower is None:
+            content, content_lower = self._prep_content(content)
+        compliance_validation = self.validate_compliance_rules(content, content_lower)
         dates_validation = self.validate_dates_and_deadlines(content)
-        ruc_validation = self.validate_ruc_in_document(content)
+        structural_validation = self.validate_document_structure(content, document_type, content_lower)
+        ruc_validation = self.validate_ruc_in_document(content, timestamp=validation_timestamp)
 
         # Scoring
         structural_score = structural_validation["completion_percentage"]
@@ -751,7 +1328,7 @@ class ComplianceValidationAgent:
 
         validation_report: Dict[str, Any] = {
             "document_type": document_type,
-            "validation_timestamp": datetime.now().isoformat(),
+            "validation_timestamp": validation_timestamp or datetime.now().isoformat(),
             "overall_score": round(overall_score, 2),
             "validation_level": self._get_validation_level(overall_score),
             "structural_validation": structural_validation,
@@ -793,44 +1370,119 @@ class ComplianceValidationAgent:
         if output_path:
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(self.validation_results, f, ensure_ascii=False, indent=2)
+            with open(output_path, 'wb') as f:
+                f.write(_json_bytes(self.validation_results))
             logger.info(f"Reporte de validación guardado en: {output_path}")
 
         return self.validation_results
 
-    def validate_multiple_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        results: List[Dict[str, Any]] = []
-
-        for i, doc in enumerate(documents):
-            try:
-                result = self.validate_document(
-                    document_path=doc.get('path'),
-                    content=doc.get('content'),
-                    document_type=doc.get('type', 'RFP')
-                )
-                result['document_id'] = doc.get('id', f"doc_{i}")
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Error validando documento {i}: {e}")
-                results.append({
-                    'document_id': doc.get('id', f"doc_{i}"),
-                    'error': str(e),
-                    'overall_score': 0,
-                    'validation_level': 'ERROR'
-                })
+    def export_batch_report(self, comparative_report: Dict[str, Any], output_path: Path) -> Path:
+        """
+        Exporta el resultado de validate_multiple_documents como JSON Lines: un reporte de
+        documento por línea, escrito de forma incremental con un buffer de 1 MiB.
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            for result in comparative_report.get('documents_results', []):
+                f.write(_json_bytes(result, indent=False))
+                f.write(b'\n')
+        logger.info(f"Reporte de lote guardado en: {output_path}")
+        return output_path
+
+    def _validate_indexed_document(self, i: int, doc: Dict[str, Any],
+                                   validation_timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Valida un documento del lote; los errores se devuelven como resultado con nivel ERROR."""
+        try:
+            result = self.validate_document(
+                document_path=doc.get('path'),
+                content=doc.get('content'),
+                document_type=doc.get('type', 'RFP'),
+                validation_timestamp=validation_timestamp
+            )
+            result['document_id'] = doc.get('id', f"doc_{i}")
+            return result
+        except Exception as e:
+            logger.error(f"Error validando documento {i}: {e}")
+            return {
+                'document_id': doc.get('id', f"doc_{i}"),
+                'error': str(e),
+                'overall_score': 0,
+                'validation_level': 'ERROR'
+            }
 
-        scores = [r['overall_score'] for r in results if 'overall_score' in r]
+    def validate_multiple_documents(self, documents: List[Dict[str, Any]], parallel: bool = False) -> Dict[str, Any]:
+        """
+        Valida un lote de documentos. Con `parallel=True` (scripts / lotes grandes, no dentro del
+        servidor) el lote se reparte entre procesos si tiene al menos PARALLEL_MIN_DOCUMENTS.
+        """
+        # Una sola marca de tiempo para todo el lote
+        batch_timestamp = datetime.now().isoformat()
+        if not parallel or len(documents) < self.PARALLEL_MIN_DOCUMENTS:
+            results = [
+                self._validate_indexed_document(i, doc, batch_timestamp) for i, doc in enumerate(documents)
+            ]
+        else:
+            # Cada documento es independiente y CPU-bound (regex, extracción): un proceso por núcleo
+            n = len(documents)
+            with ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, n),
+                initializer=_init_validation_worker,
+                initargs=(self.vector_db_path, self.use_embeddings),
+            ) as executor:
+                results = list(executor.map(
+                    _validate_one, range(n), documents, repeat(batch_timestamp), chunksize=4
+                ))
+            # Como en el camino secuencial: el agente conserva el último reporte válido
+            last_report = next((r for r in reversed(results) if 'error' not in r), None)
+            if last_report is not None:
+                self.validation_results = last_report
+
+        # Resumen en una sola pasada sobre los resultados
+        failed = 0
+        score_count = 0
+        score_sum = 0
+        best_score = worst_score = 0
+        for r in results:
+            if 'error' in r:
+                failed += 1
+            score = r.get('overall_score')
+            if score is None:
+                continue
+            if score_count == 0:
+                best_score = worst_score = score
+            elif score > best_score:
+                best_score = score
+            elif score < worst_score:
+                worst_score = score
+            score_sum += score
+            score_count += 1
 
         comparative_report = {
-            "validation_timestamp": datetime.now().isoformat(),
+            "validation_timestamp": batch_timestamp,
             "total_documents": len(documents),
-            "successful_validations": len([r for r in results if 'error' not in r]),
-            "failed_validations": len([r for r in results if 'error' in r]),
-            "average_score": (sum(scores) / len(scores)) if scores else 0,
-            "best_score": max(scores) if scores else 0,
-            "worst_score": min(scores) if scores else 0,
+            "successful_validations": len(results) - failed,
+            "failed_validations": failed,
+            "average_score": (score_sum / score_count) if score_count else 0,
+            "best_score": best_score,
+            "worst_score": worst_score,
             "documents_results": results
         }
 
         return comparative_report
+
+
+# Agente de cada proceso worker de validate_multiple_documents (uno por proceso, no por documento)
+_WORKER_AGENT: Optional[ComplianceValidationAgent] = None
+
+
+def _init_validation_worker(vector_db_path: Path, use_embeddings: bool) -> None:
+    """Initializer de ProcessPoolExecutor: crea el agente del proceso una sola vez."""
+    global _WORKER_AGENT
+    _WORKER_AGENT = ComplianceValidationAgent(vector_db_path=vector_db_path, use_embeddings=use_embeddings)
+
+
+def _validate_one(i: int, doc: Dict[str, Any], validation_timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """Worker de ProcessPoolExecutor: valida un documento con el agente del proceso."""
+    assert _WORKER_AGENT is not None
+    return _WORKER_AGENT._validate_indexed_document(i, doc, validation_timestamp)
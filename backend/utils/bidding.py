@@ -1,39 +1,66 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, NamedTuple, Optional, Any, Union
 from pathlib import Path
+import heapq
+import importlib
 import json
+import hashlib
 import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
+from functools import cached_property, lru_cache
+
+# Agentes implementados: se importan en su primer uso (PEP 562), así importar este módulo
+# no arrastra DSPy, Chroma ni modelos si sólo se usan utilidades. Si faltan dependencias
+# opcionales, el agente queda como None.
+_AGENT_MODULES = {
+    "DocumentExtractionAgent": ".agents.document_extraction",
+    "DocumentClassificationAgent": ".agents.document_classification",
+    "ComplianceValidationAgent": ".agents.validator",
+    "ComparisonAgent": ".agents.comparison",
+    "RiskAnalyzerAgent": ".agents.risk_analyzer",
+    "ReportGenerationAgent": ".agents.reporter",
+}
+
+
+def _agent_class(name: str):
+    """Clase del agente `name`, importada y guardada en el módulo la primera vez (None si no está disponible)."""
+    if name not in globals():
+        try:
+            agent_class = getattr(importlib.import_module(_AGENT_MODULES[name], __package__), name)
+        except ImportError:
+            agent_class = None
+        globals()[name] = agent_class
+    return globals()[name]
 
-# Importar todos los agentes implementados (manejo de errores para dependencias opcionales)
-try:
-    from .agents.document_extraction import DocumentExtractionAgent
-except ImportError:
-    DocumentExtractionAgent = None
 
-try:
-    from .agents.document_classification import DocumentClassificationAgent
-except ImportError:
-    DocumentClassificationAgent = None
+def __getattr__(name: str):
+    if name in _AGENT_MODULES:
+        return _agent_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-try:
-    from .agents.validator import ComplianceValidationAgent
-except ImportError:
-    ComplianceValidationAgent = None
 
+# pyahocorasick (opcional): búsqueda simultánea de palabras clave
 try:
-    from .agents.comparison import ComparisonAgent
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
 except ImportError:
-    ComparisonAgent = None
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
 
+# orjson (opcional): serialización JSON más rápida de los resultados
 try:
-    from .agents.risk_analyzer import RiskAnalyzerAgent
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    RiskAnalyzerAgent = None
-
-try:
-    from .agents.reporter import ReportGenerationAgent
-except ImportError:
-    ReportGenerationAgent = None
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 # Importar database manager
 from .db_manager import get_standard_db_path, get_analysis_path
@@ -41,7 +68,229 @@ from .db_manager import get_standard_db_path, get_analysis_path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-DATA_DIR = "../../data"
+# Resuelto una sola vez respecto a este módulo (independiente del directorio de trabajo)
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+# Caché de extracciones compartida por todos los sistemas del proceso
+EXTRACT_CACHE_DIR = DATA_DIR / "extract_cache"
+# Análisis de RFP memorizados por (ruta, mtime, tamaño) (ver RFPAnalyzer.analyze_rfp)
+RFP_CACHE_DIR = DATA_DIR / "rfp_cache"
+
+# Patrones de requisitos y criterios de RFP, compilados una sola vez
+_RFP_REQUIREMENT_SOURCES = {
+    "technical": [r"requisitos?\s+t[éeé]cnicos?", r"especificaciones?\s+t[éeé]cnicas?", r"tecnolog[íi]a\s+requerida"],
+    "functional": [r"requisitos?\s+funcionales?", r"funcionalidades?\s+requeridas?", r"caracter[íi]sticas\s+del\s+sistema"],
+    "compliance": [r"cumplimiento\s+normativo", r"regulaciones?\s+aplicables?", r"est[áa]ndares?\s+requeridos?"],
+}
+# Un grupo con nombre por patrón (en el orden original) -> tipo de requisito
+_RFP_REQUIREMENT_GROUPS = {
+    f"{req_type}_{i}": req_type
+    for req_type, type_patterns in _RFP_REQUIREMENT_SOURCES.items()
+    for i in range(len(type_patterns))
+}
+# Todos los patrones en una sola pasada; el lookahead con las letras iniciales descarta
+# rápido las posiciones que no pueden empezar ningún patrón
+_RFP_REQUIREMENT_RE = re.compile(
+    "(?=[%s])(?:%s)"
+    % (
+        "".join(sorted({p[0] for type_patterns in _RFP_REQUIREMENT_SOURCES.values() for p in type_patterns})),
+        "|".join(
+            f"(?P<{req_type}_{i}>{p})"
+            for req_type, type_patterns in _RFP_REQUIREMENT_SOURCES.items()
+            for i, p in enumerate(type_patterns)
+        ),
+    ),
+    re.IGNORECASE,
+)
+# Literales que aparecen (en minúsculas) en toda coincidencia de algún patrón de requisitos:
+# si el texto no contiene ninguno, el regex no puede encontrar nada
+_RFP_REQUIREMENT_ANCHORS = (
+    "requisito",
+    "especificaci",
+    "tecnolog",
+    "funcionalidad",
+    "caracter",
+    "cumplimiento",
+    "regulaci",
+    "estándar",
+    "estandar",
+)
+# Tipo de requisito en rfp_requirements -> contador en extract_requirements_summary
+_REQ_TYPE_COUNT_KEY = {f"{req_type}_requirements": f"{req_type}_requirements_count" for req_type in _RFP_REQUIREMENT_SOURCES}
+
+# (literal obligatorio en minúsculas, patrón): sin el literal el patrón no puede coincidir.
+# El criterio llega hasta el fin de la frase (punto, punto y coma o salto de línea), máx. 100 caracteres
+_SCORE_PATTERNS = [
+    (literal, re.compile(p, re.IGNORECASE))
+    for literal, p in (
+        ("punto", r"(\d+)\s*puntos?\s+por\s+([^\n.;]{1,100})"),
+        ("%", r"(\d+%)\s+([^\n.;]{1,100})"),
+        ("peso", r"peso\s+(\d+)\s*%?\s+([^\n.;]{1,100})"),
+    )
+]
+
+# Palabras clave por tipo de trabajo (el orden de las claves define el desempate)
+_WORK_TYPE_KEYWORDS = {
+    "CONSTRUCCION": (
+        "construcción",
+        "edificación",
+        "obra civil",
+        "infraestructura",
+        "concreto",
+        "acero",
+        "cemento",
+        "excavación",
+        "cimentación",
+        "estructura",
+        "albañilería",
+        "arquitectura",
+        "ingeniería civil",
+        "proyecto de construcción",
+        "obra pública",
+        "edificio",
+        "carretera",
+        "puente",
+        "túnel",
+        "drenaje",
+        "pavimento",
+    ),
+    "SERVICIOS": (
+        "servicios profesionales",
+        "consultoría",
+        "asesoría",
+        "auditoría",
+        "capacitación",
+        "entrenamiento",
+        "diseño",
+        "estudios técnicos",
+        "supervisión",
+        "interventoría",
+        "servicios de ingeniería",
+        "servicios de arquitectura",
+        "mantenimiento",
+        "soporte técnico",
+        "desarrollo de software",
+    ),
+    "SUMINISTROS": (
+        "suministro",
+        "adquisición",
+        "compra",
+        "equipos",
+        "materiales",
+        "insumos",
+        "productos",
+        "bienes",
+        "mobiliario",
+        "tecnología",
+        "software",
+        "hardware",
+        "vehículos",
+        "maquinaria",
+        "herramientas",
+        "instrumentos",
+    ),
+}
+
+
+# Tipo de trabajo por digest del contenido en minúsculas (acotada; se descarta la entrada más antigua)
+_WORK_TYPE_CACHE_SIZE = 512
+_work_type_cache: "OrderedDict[bytes, str]" = OrderedDict()
+# Se consulta desde hilos de etapas y de compare_proposals a la vez
+_work_type_cache_lock = threading.Lock()
+
+
+def _build_keyword_automaton(keywords):
+    """Autómata Aho-Corasick que devuelve cada keyword encontrada (None sin pyahocorasick)."""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_WORK_TYPE_AC = _build_keyword_automaton({kw for kws in _WORK_TYPE_KEYWORDS.values() for kw in kws})
+
+# Registro de agentes compartidos por proceso. Sólo el extractor, que no guarda estado de un
+# análisis; validador, clasificador, comparador, riesgos y reportes son de cada sistema.
+_agents: Dict[str, Any] = {}
+_agents_lock = threading.Lock()
+
+
+def _get(key: str, factory):
+    """Devuelve la instancia única del agente `key`, creándola con `factory` si hace falta."""
+    agent = _agents.get(key)
+    if agent is None:
+        with _agents_lock:
+            agent = _agents.get(key)
+            if agent is None and factory is not None:
+                agent = _agents[key] = factory()
+    return agent
+
+
+# Conexiones al índice de caché de análisis: una por archivo y proceso, con su lock (ver _analysis_index)
+_analysis_indexes: Dict[str, tuple] = {}
+_analysis_indexes_lock = threading.Lock()
+
+
+def _reset_analysis_indexes() -> None:
+    """Tras un fork (workers de analyze_documents) el hijo abre sus propias conexiones."""
+    global _analysis_indexes, _analysis_indexes_lock
+    _analysis_indexes = {}
+    _analysis_indexes_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_analysis_indexes)
+
+
+def _json_bytes(data: Any) -> bytes:
+    """JSON UTF-8 indentado (sin escapar acentos) con orjson; json estándar si no está o no admite algún tipo."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _new_id(prefix: str, stem: str = "") -> str:
+    """Identificador único y ordenable por tiempo: `prefix_<ns hex><aleatorio>[_stem]`."""
+    uid = f"{prefix}_{time.time_ns():x}{os.urandom(3).hex()}"
+    return f"{uid}_{stem}" if stem else uid
+
+
+def _doc_hash(document_path: str) -> str:
+    """SHA-256 del contenido del documento, leído en bloques de 1 MiB."""
+    digest = hashlib.sha256()
+    with open(document_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _read_cached_extraction(cache_file: str) -> bytes:
+    """Bytes de una extracción de la caché en disco; las más usadas quedan en memoria."""
+    with open(cache_file, "rb") as f:
+        return f.read()
+
+
+def _load_cached_extraction(cache_file: str) -> Dict[str, Any]:
+    """Carga una extracción de la caché; cada llamada devuelve un dict nuevo que el llamador puede modificar."""
+    return json.loads(_read_cached_extraction(cache_file))
+
+
+class AnalysisRef(NamedTuple):
+    """Referencia ligera a un análisis: el resultado completo vive una sola vez en memoria o en disco."""
+
+    document_id: str
+    summary: Dict[str, Any]
+    status: str
+
+    @classmethod
+    def from_analysis(cls, analysis: Dict[str, Any]) -> "AnalysisRef":
+        summary = analysis.get("summary", {})
+        return cls(analysis["document_id"], summary, summary.get("overall_status", "unknown"))
 
 
 class BiddingAnalysisSystem:
@@ -51,7 +300,12 @@ class BiddingAnalysisSystem:
     propuestas y procesos de licitación.
     """
 
-    def __init__(self, data_dir: str = DATA_DIR):
+    # Máximo de etapas de análisis (agentes) ejecutadas en paralelo por documento
+    MAX_PARALLEL_AGENTS = 4
+    # Máximo de propuestas analizadas en paralelo en compare_proposals
+    MAX_PARALLEL_PROPOSALS = 8
+
+    def __init__(self, data_dir: Union[str, Path] = DATA_DIR):
         """
         Inicializa el sistema de análisis con todos los agentes
 
@@ -61,29 +315,69 @@ class BiddingAnalysisSystem:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
-        logger.info("Inicializando Sistema de Análisis de Licitaciones...")
-
-        # Inicializar agentes disponibles
-        # (Extractor se instancia por documento en analyze_document)
-        self.document_extractor = None
-
-        self.classifier = DocumentClassificationAgent() if DocumentClassificationAgent else None
+        # Caché de extracciones indexada por hash del contenido
+        self.extract_cache_dir = EXTRACT_CACHE_DIR
 
-        # Validador SIN embeddings (no los usamos aquí)
-        self.validator = (
-            ComplianceValidationAgent(use_embeddings=False) if ComplianceValidationAgent else None
-        )
+        logger.info("Inicializando Sistema de Análisis de Licitaciones...")
 
-        self.comparator = ComparisonAgent() if ComparisonAgent else None
-        self.risk_analyzer = RiskAnalyzerAgent() if RiskAnalyzerAgent else None
-        self.reporter = ReportGenerationAgent() if ReportGenerationAgent else None
+        # Los agentes se construyen de forma perezosa en su primer acceso
+        # (ver propiedades más abajo), así sólo se paga por los que se usan.
 
         # Estado del sistema
         self.processed_documents = {}
         self.analysis_results = {}
+        self._results_lock = threading.Lock()
+        # Caché de análisis por (hash, tipo, nivel) (JSON serializado) e índice SQLite en data_dir
+        self._analysis_cache: Dict[tuple, bytes] = {}
+        # Agentes con estado (documento, BD vectorial, último resultado) propios de este sistema.
+        # compare_proposals analiza propuestas en paralelo: el uso de clasificador, analizador
+        # de riesgos y comparador se serializa con su lock
+        self._own_agents: Dict[str, Any] = {}
+        self._own_agents_lock = threading.Lock()
+        self._classifier_lock = threading.Lock()
+        self._risk_lock = threading.Lock()
+        self._comparator_lock = threading.Lock()
         self.system_initialized = False
 
-        logger.info("Todos los agentes han sido inicializados exitosamente")
+        logger.info("Sistema listo; los agentes se inicializarán bajo demanda")
+
+    @cached_property
+    def document_extractor(self):
+        """Extractor compartido; el documento se pasa como argumento en cada llamada."""
+        return _get("extractor", _agent_class("DocumentExtractionAgent"))
+
+    @cached_property
+    def classifier(self):
+        return self._own_agent("DocumentClassificationAgent")
+
+    @cached_property
+    def validator(self):
+        # Validador SIN embeddings (no los usamos aquí). Es de cada sistema: validate_document
+        # guarda el último reporte en el agente (ver export_validation_report)
+        return self._own_agent("ComplianceValidationAgent", use_embeddings=False)
+
+    @cached_property
+    def comparator(self):
+        return self._own_agent("ComparisonAgent")
+
+    @cached_property
+    def risk_analyzer(self):
+        return self._own_agent("RiskAnalyzerAgent")
+
+    @cached_property
+    def reporter(self):
+        return self._own_agent("ReportGenerationAgent")
+
+    def _own_agent(self, name: str, **kwargs):
+        """Instancia de este sistema del agente `name` (una sola aunque la pidan varios hilos)."""
+        agent = self._own_agents.get(name)
+        if agent is None:
+            with self._own_agents_lock:
+                agent = self._own_agents.get(name)
+                agent_class = _agent_class(name)
+                if agent is None and agent_class is not None:
+                    agent = self._own_agents[name] = agent_class(**kwargs)
+        return agent
 
     def initialize_system(self, provider="auto", model=None):
         """
@@ -118,8 +412,78 @@ class BiddingAnalysisSystem:
             logger.error(f"Error inicializando sistema: {e}")
             self.system_initialized = False
 
+    def _extract_document(
+        self, document_path: str, use_cache: bool = True, doc_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Extrae el contenido del documento reutilizando la caché en disco cuando
+        el mismo contenido ya fue procesado.
+        """
+        extractor = self.document_extractor
+        if not extractor:
+            raise RuntimeError("DocumentExtractionAgent no disponible")
+
+        cache_file = None
+        if use_cache:
+            try:
+                cache_file = self.extract_cache_dir / f"{doc_hash or _doc_hash(document_path)}.json"
+                if cache_file.exists():
+                    logger.info(f"Extracción recuperada de caché: {cache_file.name}")
+                    return _load_cached_extraction(str(cache_file))
+            except Exception as e:
+                logger.warning(f"No se pudo leer la caché de extracción: {e}")
+
+        extracted_data = extractor.process_document(document_path)
+
+        if cache_file is not None and extracted_data and extracted_data.get("content"):
+            try:
+                self.extract_cache_dir.mkdir(parents=True, exist_ok=True)
+                cache_file.write_bytes(_json_bytes(extracted_data))
+            except Exception as e:
+                logger.warning(f"No se pudo guardar la caché de extracción: {e}")
+
+        return extracted_data
+
+    def _extracted_text_path(self, content: str) -> Optional[Path]:
+        """
+        Persiste el texto extraído como .txt (indexado por su hash) para que el
+        clasificador lo reutilice en lugar de volver a convertir el documento.
+        """
+        try:
+            text_path = self.extract_cache_dir / f"{hashlib.sha256(content.encode('utf-8')).hexdigest()}.txt"
+            if not text_path.exists():
+                self.extract_cache_dir.mkdir(parents=True, exist_ok=True)
+                text_path.write_text(content, encoding="utf-8")
+            return text_path
+        except Exception as e:
+            logger.warning(f"No se pudo guardar el texto extraído: {e}")
+            return None
+
+    def warm_cache(self, documents: List[str]) -> int:
+        """
+        Precalcula y persiste la extracción de los documentos indicados para que
+        los análisis posteriores (de cualquier sistema del proceso) la lean del disco.
+
+        Returns:
+            Número de documentos que quedaron en caché
+        """
+        cached = 0
+        for document_path in documents:
+            try:
+                if self._extract_document(document_path).get("content"):
+                    cached += 1
+            except Exception as e:
+                logger.error(f"Error precalculando extracción de {document_path}: {e}")
+
+        logger.info(f"Caché de extracción precalculada: {cached}/{len(documents)} documentos")
+        return cached
+
     def analyze_document(
-        self, document_path: str, document_type: str = "unknown", analysis_level: str = "comprehensive"
+        self,
+        document_path: str,
+        document_type: str = "unknown",
+        analysis_level: str = "comprehensive",
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Análisis completo de un documento usando todos los agentes apropiados
@@ -128,6 +492,8 @@ class BiddingAnalysisSystem:
             document_path: Ruta al documento a analizar
             document_type: Tipo de documento (rfp, proposal, contract, etc.)
             analysis_level: Nivel de análisis ("basic", "standard", "comprehensive")
+            use_cache: Reutilizar el análisis (o la extracción) en caché si el mismo
+                contenido ya fue procesado con el mismo tipo y nivel
 
         Returns:
             Resultados completos del análisis
@@ -137,7 +503,32 @@ class BiddingAnalysisSystem:
             logger.warning("Sistema no inicializado. Inicializando automáticamente...")
             self.initialize_system()
 
-        document_id = f"doc_{int(datetime.now().timestamp())}_{Path(document_path).stem}"
+        document_id = _new_id("doc", os.path.splitext(os.path.basename(document_path))[0])
+
+        # Caché de análisis direccionada por contenido: (hash, tipo, nivel)
+        doc_hash = None
+        if use_cache:
+            try:
+                doc_hash = _doc_hash(document_path)
+                cached = self._cached_analysis((doc_hash, document_type, analysis_level))
+            except Exception as e:
+                logger.warning(f"No se pudo consultar la caché de análisis: {e}")
+                cached = None
+            if cached is not None:
+                logger.info(f"Análisis recuperado de caché para {document_path} ({cached['document_id']})")
+                cached.update(
+                    {
+                        "cached_from": cached["document_id"],
+                        "document_id": document_id,
+                        "document_path": document_path,
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                )
+                with self._results_lock:
+                    self.processed_documents[document_id] = document_path
+                    self.analysis_results[document_id] = cached
+                self._persist_analysis(document_id, cached)
+                return cached
 
         logger.info(f"Iniciando análisis {analysis_level} del documento: {document_path}")
 
@@ -155,15 +546,11 @@ class BiddingAnalysisSystem:
         # Initialize content variable
         content = ""
 
-        # 1) Extracción de documento (instancia por documento)
+        # 1) Extracción de documento
         try:
             logger.info("Etapa 1: Extrayendo contenido del documento...")
 
-            if not DocumentExtractionAgent:
-                raise RuntimeError("DocumentExtractionAgent no disponible")
-
-            extractor = DocumentExtractionAgent(document_path)
-            extracted_data = extractor.process_document()
+            extracted_data = self._extract_document(document_path, use_cache=use_cache, doc_hash=doc_hash)
 
             analysis_result["stages"]["extraction"] = {
                 "status": "completed",
@@ -181,75 +568,25 @@ class BiddingAnalysisSystem:
             analysis_result["errors"].append(error_msg)
             analysis_result["stages"]["extraction"] = {"status": "failed", "error": str(e)}
 
-        # 2) Clasificación de documento (DSPy)
+        # 2-4) Clasificación, validación y RUC sólo dependen del contenido: se ejecutan en paralelo
+        # (una sola copia en minúsculas compartida por las etapas)
+        content_lower = content.lower()
+        stage_tasks = []
         if analysis_level in ["standard", "comprehensive"] and content and self.classifier:
-            try:
-                logger.info("Etapa 2: Clasificando documento...")
-
-                classifier_db_path = get_standard_db_path("classification", document_id)
-
-                # Configurar classifier para este documento
-                self.classifier.document_path = document_path
-                self.classifier.vector_db_path = classifier_db_path
-                self.classifier.collection_name = f"classification_{document_id}"
-
-                classification_result = self.classifier.process_document(
-                    provider="auto",
-                    force_rebuild=True,
-                )
-
-                analysis_result["stages"]["classification"] = {
-                    "status": "completed",
-                    "data": classification_result,
-                }
-
-            except Exception as e:
-                error_msg = f"Error en clasificación: {e}"
-                logger.error(error_msg)
-                analysis_result["errors"].append(error_msg)
-                analysis_result["stages"]["classification"] = {"status": "failed", "error": str(e)}
-
-        # 3) Validación de cumplimiento
+            stage_tasks.append(
+                ("classification", "Error en clasificación", self._classify_stage, (document_path, document_id, content))
+            )
         if analysis_level in ["standard", "comprehensive"] and content and self.validator:
-            try:
-                logger.info("Etapa 3: Validando cumplimiento...")
-
-                validation_result = self.validator.validate_document(
-                    content=content, document_type=document_type
-                )
-
-                analysis_result["stages"]["validation"] = {
-                    "status": "completed",
-                    "data": validation_result,
-                }
-
-            except Exception as e:
-                error_msg = f"Error en validación: {e}"
-                logger.error(error_msg)
-                analysis_result["errors"].append(error_msg)
-                analysis_result["stages"]["validation"] = {"status": "failed", "error": str(e)}
-
-        # 4) Validación de RUC (para análisis comprehensivo)
+            stage_tasks.append(
+                ("validation", "Error en validación", self._validation_stage, (content, document_type, content_lower))
+            )
         if analysis_level == "comprehensive" and content and self.validator:
-            try:
-                logger.info("Etapa 4: Validando RUC del contratista...")
-
-                work_type = self._determine_work_type(content, document_type)
-
-                ruc_result = self.validator.validate_ruc_in_document(content=content, work_type=work_type)
-
-                analysis_result["stages"]["ruc_validation"] = {
-                    "status": "completed",
-                    "data": ruc_result,
-                }
-
-            except Exception as e:
-                error_msg = f"Error en validación de RUC: {e}"
-                logger.error(error_msg)
-                analysis_result["errors"].append(error_msg)
-                analysis_result["stages"]["ruc_validation"] = {"status": "failed", "error": str(e)}
+            stage_tasks.append(
+                ("ruc_validation", "Error en validación de RUC", self._ruc_stage, (content, document_type, content_lower))
+            )
+        self._run_parallel_stages(stage_tasks, analysis_result)
 
-        # 5) Análisis de riesgo (solo para análisis comprehensivo)
+        # 5) Análisis de riesgo (solo para análisis comprehensivo; usa el contexto de 2-4)
         if analysis_level == "comprehensive" and content and self.risk_analyzer:
             try:
                 logger.info("Etapa 5: Analizando riesgos...")
@@ -310,27 +647,29 @@ class BiddingAnalysisSystem:
                         logger.warning(f"Datos de RUC no son un diccionario: {type(ruc_data)}")
                         additional_context['ruc_validation'] = {'error': 'Formato de datos inválido'}
                 
-                # Llamar al analizador de riesgos con contexto adicional
-                if hasattr(self.risk_analyzer, 'analyze_document_risks_with_context'):
-                    # Si el método mejorado existe, úsalo
-                    risk_result = self.risk_analyzer.analyze_document_risks_with_context(
-                        content=content,
-                        document_type=document_type,
-                        doc_id=document_id,
-                        additional_context=additional_context
-                    )
-                else:
-                    # Fallback al método original
-                    risk_result = self.risk_analyzer.analyze_document_risks(
-                        content=content,
-                        document_type=document_type,
-                        doc_id=document_id
-                    )
-                    # Añadir contexto manualmente al resultado
-                    if risk_result and not isinstance(risk_result, dict):
-                        risk_result = {'error': 'Invalid risk analysis result'}
-                    elif risk_result:
-                        risk_result['additional_context'] = additional_context
+                # Llamar al analizador de riesgos con contexto adicional (guarda su BD y su
+                # última evaluación como estado: un análisis a la vez)
+                with self._risk_lock:
+                    if hasattr(self.risk_analyzer, 'analyze_document_risks_with_context'):
+                        # Si el método mejorado existe, úsalo
+                        risk_result = self.risk_analyzer.analyze_document_risks_with_context(
+                            content=content,
+                            document_type=document_type,
+                            doc_id=document_id,
+                            additional_context=additional_context
+                        )
+                    else:
+                        # Fallback al método original
+                        risk_result = self.risk_analyzer.analyze_document_risks(
+                            content=content,
+                            document_type=document_type,
+                            doc_id=document_id
+                        )
+                        # Añadir contexto manualmente al resultado
+                        if risk_result and not isinstance(risk_result, dict):
+                            risk_result = {'error': 'Invalid risk analysis result'}
+                        elif risk_result:
+                            risk_result['additional_context'] = additional_context
                 
                 analysis_result['stages']['risk_analysis'] = {
                     'status': 'completed',
@@ -349,19 +688,230 @@ class BiddingAnalysisSystem:
         analysis_result["summary"] = self._generate_analysis_summary(analysis_result)
 
         # Almacenar resultado en memoria
-        self.processed_documents[document_id] = document_path
-        self.analysis_results[document_id] = analysis_result
+        with self._results_lock:
+            self.processed_documents[document_id] = document_path
+            self.analysis_results[document_id] = analysis_result
 
-        # Guardar resultado en disco para persistencia
-        self._save_analysis_to_disk(document_id, analysis_result)
+        # Guardar resultado en disco (sólo se reutilizan análisis sin errores)
+        cache_key = (doc_hash, document_type, analysis_level) if doc_hash and not analysis_result["errors"] else None
+        self._persist_analysis(document_id, analysis_result, cache_key)
 
         logger.info(f"Análisis completado para documento {document_id}")
 
         return analysis_result
 
-    def _save_analysis_to_disk(self, document_id: str, analysis_result: Dict[str, Any]) -> bool:
+    @contextmanager
+    def _analysis_index(self):
+        """
+        Índice en disco "hash|tipo|nivel" -> analysis_result.json. Es SQLite en modo WAL:
+        cada análisis inserta una fila (sin reescribir el índice entero) y los procesos de
+        analyze_documents pueden registrar análisis a la vez sin pisarse. La conexión (y el
+        esquema) se crea una sola vez por proceso; los hilos la usan de a uno.
+        """
+        index_db = str((self.data_dir / "_analysis_cache.sqlite").resolve())
+        with _analysis_indexes_lock:
+            entry = _analysis_indexes.get(index_db)
+            if entry is None:
+                db = sqlite3.connect(index_db, timeout=30, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS analysis_cache "
+                    "(cache_key TEXT PRIMARY KEY, result_file TEXT NOT NULL)"
+                )
+                entry = _analysis_indexes[index_db] = (db, threading.Lock())
+        db, lock = entry
+        with lock:
+            yield db
+
+    def _cached_analysis(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Copia de un análisis previo con la misma clave, desde memoria o disco."""
+        with self._results_lock:
+            payload = self._analysis_cache.get(key)
+        if payload is None:
+            # La consulta al índice y la lectura del archivo van fuera del lock
+            with self._analysis_index() as db:
+                row = db.execute(
+                    "SELECT result_file FROM analysis_cache WHERE cache_key = ?", ("|".join(key),)
+                ).fetchone()
+            if not row or not Path(row[0]).exists():
+                return None
+            payload = Path(row[0]).read_bytes()
+            with self._results_lock:
+                payload = self._analysis_cache.setdefault(key, payload)
+        return json.loads(payload)
+
+    def _remember_analysis(self, key: tuple, document_id: str, payload: bytes) -> None:
+        """Registra el análisis (JSON ya serializado) en la caché en memoria y en el índice en disco."""
+        result_file = (get_analysis_path(document_id) / "analysis_result.json").resolve()
+        with self._results_lock:
+            self._analysis_cache[key] = payload
+        try:
+            with self._analysis_index() as db, db:
+                db.execute("INSERT OR REPLACE INTO analysis_cache VALUES (?, ?)", ("|".join(key), str(result_file)))
+        except Exception as e:
+            logger.warning(f"No se pudo guardar el índice de caché de análisis: {e}")
+
+    def _classify_stage(self, document_path: str, document_id: str, content: str) -> Dict[str, Any]:
+        logger.info("Etapa 2: Clasificando documento...")
+
+        text_path = self._extracted_text_path(content)
+
+        # El clasificador guarda el documento como estado: un análisis a la vez
+        with self._classifier_lock:
+            # La BD vectorial se direcciona por el contenido (el .txt se nombra con su hash) y por el
+            # proveedor/modelo de embeddings: un mismo texto reutiliza sus embeddings entre análisis
+            # en lugar de reconstruirlos por document_id, sin mezclar dimensiones de otro modelo
+            if text_path:
+                self.classifier.initialize_dspy_and_embeddings(provider="auto")
+                info = getattr(self.classifier, "provider_info", None) or {}
+                embedding_id = f"{info.get('embedding_provider', '')}|{info.get('embedding_model', '')}"
+                embedding_tag = hashlib.sha256(embedding_id.encode("utf-8")).hexdigest()[:8]
+                db_key = f"content_{text_path.stem[:24]}_{embedding_tag}"
+            else:
+                db_key = document_id
+            classifier_db_path = get_standard_db_path("classification", db_key)
+
+            # Configurar classifier para este documento
+            self.classifier.document_path = document_path
+            # Reutilizar el texto de la etapa 1 (sin volver a parsear/OCR el documento)
+            self.classifier.text_path = text_path
+            self.classifier.vector_db_path = classifier_db_path
+            self.classifier.collection_name = f"classification_{db_key}"
+
+            return self.classifier.process_document(
+                provider="auto",
+                force_rebuild=text_path is None,
+            )
+
+    def _validation_stage(self, content: str, document_type: str, content_lower: str) -> Dict[str, Any]:
+        logger.info("Etapa 3: Validando cumplimiento...")
+        return self.validator.validate_document(
+            content=content, document_type=document_type, content_lower=content_lower
+        )
+
+    def _ruc_stage(self, content: str, document_type: str, content_lower: str) -> Dict[str, Any]:
+        logger.info("Etapa 4: Validando RUC del contratista...")
+        work_type = self._determine_work_type(content, document_type, content_lower)
+        return self.validator.validate_ruc_in_document(content=content, work_type=work_type)
+
+    def _run_parallel_stages(self, stage_tasks: List[tuple], analysis_result: Dict[str, Any]) -> None:
+        """
+        Ejecuta etapas independientes en un pool de hilos (los agentes esperan sobre todo
+        E/S y LLM) y registra los resultados en el orden de `stage_tasks`.
+        """
+        if not stage_tasks:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_AGENTS, len(stage_tasks))) as pool:
+            futures = [(name, error_prefix, pool.submit(fn, *args)) for name, error_prefix, fn, args in stage_tasks]
+
+            for name, error_prefix, future in futures:
+                try:
+                    analysis_result["stages"][name] = {"status": "completed", "data": future.result()}
+                except Exception as e:
+                    error_msg = f"{error_prefix}: {e}"
+                    logger.error(error_msg)
+                    analysis_result["errors"].append(error_msg)
+                    analysis_result["stages"][name] = {"status": "failed", "error": str(e)}
+
+    def analyze_documents(
+        self,
+        documents: List[str],
+        document_type: str = "unknown",
+        analysis_level: str = "comprehensive",
+        workers: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Analiza varios documentos en paralelo con un pool de procesos
+
+        Args:
+            documents: Rutas de los documentos a analizar
+            document_type: Tipo común de los documentos
+            analysis_level: Nivel de análisis ("basic", "standard", "comprehensive")
+            workers: Número de procesos (por defecto BIDDING_WORKERS o núcleos - 1)
+
+        Returns:
+            Resultados de análisis en el mismo orden que `documents`
+        """
+        if workers is None:
+            workers = int(os.getenv("BIDDING_WORKERS", "0")) or max(1, (os.cpu_count() or 1) - 1)
+        workers = min(workers, len(documents))
+
+        if workers <= 1:
+            return [self.analyze_document(doc, document_type, analysis_level) for doc in documents]
+
+        logger.info(f"Analizando {len(documents)} documentos con {workers} procesos")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_analysis_worker,
+            initargs=(str(self.data_dir),),
+        ) as pool:
+            results = list(
+                pool.map(
+                    _analyze_one,
+                    documents,
+                    [document_type] * len(documents),
+                    [analysis_level] * len(documents),
+                    chunksize=4,
+                )
+            )
+
+        # Los workers no comparten memoria: registrar los resultados en este proceso
+        with self._results_lock:
+            for result in results:
+                document_id = result.get("document_id")
+                if document_id:
+                    self.processed_documents[document_id] = result.get("document_path")
+                    self.analysis_results[document_id] = result
+
+        return results
+
+    def _persist_analysis(
+        self, document_id: str, analysis_result: Dict[str, Any], cache_key: Optional[tuple] = None
+    ) -> None:
+        """
+        Guarda el análisis en disco y, con `cache_key`, lo registra en la caché de análisis.
+        Se serializa una sola vez y antes de devolver el resultado: el llamador puede seguir
+        modificándolo (p. ej. analyze_rfp_requirements) y la API lee el archivo enseguida.
+        """
+        payload = _json_bytes(analysis_result)
+        if self._save_analysis_to_disk(document_id, analysis_result, payload) and cache_key:
+            self._remember_analysis(cache_key, document_id, payload)
+
+    def get_analysis(self, ref: Union[str, AnalysisRef, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Resuelve un análisis completo a partir de su document_id, un AnalysisRef o el propio análisis:
+        primero en memoria y, si no está, desde `analysis_result.json` en disco.
+        """
+        if isinstance(ref, dict):
+            if "stages" in ref:
+                return ref
+            ref = ref.get("document_id")
+        document_id = ref.document_id if isinstance(ref, AnalysisRef) else ref
+        if not document_id:
+            return None
+
+        with self._results_lock:
+            analysis = self.analysis_results.get(document_id)
+        if analysis is not None:
+            return analysis
+
+        result_file = get_analysis_path(document_id) / "analysis_result.json"
+        try:
+            return json.loads(result_file.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"No se pudo cargar el análisis {document_id} desde disco: {e}")
+            return None
+
+    def _save_analysis_to_disk(
+        self, document_id: str, analysis_result: Dict[str, Any], payload: Optional[bytes] = None
+    ) -> bool:
         """
         Guarda los resultados de análisis en disco para persistencia
+        (`payload` es el JSON ya serializado del resultado, si se tiene)
         """
         try:
             analysis_db_path = get_analysis_path(document_id)
@@ -369,8 +919,7 @@ class BiddingAnalysisSystem:
 
             # Resultado principal
             result_file = analysis_db_path / "analysis_result.json"
-            with open(result_file, "w", encoding="utf-8") as f:
-                json.dump(analysis_result, f, ensure_ascii=False, indent=2)
+            result_file.write_bytes(payload if payload is not None else _json_bytes(analysis_result))
 
             # Resumen
             if "summary" in analysis_result:
@@ -381,8 +930,7 @@ class BiddingAnalysisSystem:
                     "summary": analysis_result["summary"],
                     "status": analysis_result.get("status", "unknown"),
                 }
-                with open(summary_file, "w", encoding="utf-8") as f:
-                    json.dump(summary_data, f, ensure_ascii=False, indent=2)
+                summary_file.write_bytes(_json_bytes(summary_data))
 
             logger.info(f"Análisis guardado en disco: {analysis_db_path}")
             return True
@@ -392,16 +940,34 @@ class BiddingAnalysisSystem:
             return False
 
     def compare_proposals(
-        self, proposal_paths: List[str], comparison_criteria: Optional[Dict] = None
+        self,
+        proposal_paths: List[Union[str, AnalysisRef, Dict[str, Any]]],
+        comparison_criteria: Optional[Dict] = None,
     ) -> Dict[str, Any]:
         """
-        Compara múltiples propuestas usando los agentes de comparación
+        Compara múltiples propuestas usando los agentes de comparación.
+
+        Cada propuesta puede ser una ruta (se analiza) o un análisis ya hecho: su document_id,
+        un AnalysisRef o el resultado completo (se resuelve con `get_analysis`, sin reanalizar).
+        `individual_analyses` contiene por propuesta sólo la referencia (document_id, resumen,
+        estado) y los errores; el análisis completo se obtiene con `get_analysis(document_id)`.
         """
 
         logger.info(f"Comparando {len(proposal_paths)} propuestas")
 
+        # Análisis ya disponibles (no rutas): se resuelven aquí y no se vuelven a analizar
+        prior_analyses = {
+            i: self.get_analysis(proposal)
+            for i, proposal in enumerate(proposal_paths)
+            if not isinstance(proposal, (str, Path))
+        }
+        proposal_paths = [
+            str(proposal) if i not in prior_analyses else (prior_analyses[i] or {}).get("document_path", "")
+            for i, proposal in enumerate(proposal_paths)
+        ]
+
         comparison_result = {
-            "comparison_id": f"comparison_{int(datetime.now().timestamp())}",
+            "comparison_id": _new_id("comparison"),
             "proposals": proposal_paths,
             "timestamp": datetime.now().isoformat(),
             "individual_analyses": {},
@@ -411,145 +977,170 @@ class BiddingAnalysisSystem:
             "errors": [],
         }
 
-        # 1. Analizar cada propuesta individualmente
+        # 1. Analizar cada propuesta individualmente (en paralelo; un fallo no detiene el resto)
         proposal_analyses = {}
-        for i, proposal_path in enumerate(proposal_paths):
-            try:
-                proposal_id = f"proposal_{i+1}"
-                analysis = self.analyze_document(
-                    proposal_path, document_type="proposal", analysis_level="comprehensive"
+        with ThreadPoolExecutor(max_workers=max(1, min(len(proposal_paths), self.MAX_PARALLEL_PROPOSALS))) as pool:
+            futures = [
+                (
+                    f"proposal_{i+1}",
+                    proposal_path,
+                    pool.submit(
+                        self.analyze_document, proposal_path, document_type="proposal", analysis_level="comprehensive"
+                    )
+                    if i not in prior_analyses
+                    else None,
                 )
-                proposal_analyses[proposal_id] = analysis
-                comparison_result["individual_analyses"][proposal_id] = analysis
+                for i, proposal_path in enumerate(proposal_paths)
+            ]
 
-            except Exception as e:
-                error_msg = f"Error analizando propuesta {proposal_path}: {e}"
-                logger.error(error_msg)
-                comparison_result["errors"].append(error_msg)
+            for i, (proposal_id, proposal_path, future) in enumerate(futures):
+                try:
+                    analysis = future.result() if future is not None else prior_analyses[i]
+                    if analysis is None:
+                        raise ValueError("análisis no encontrado en memoria ni en disco")
+                    proposal_analyses[proposal_id] = analysis
+                    # Sólo una referencia: el análisis completo queda en self.analysis_results / disco
+                    comparison_result["individual_analyses"][proposal_id] = {
+                        **AnalysisRef.from_analysis(analysis)._asdict(),
+                        "errors": analysis.get("errors", []),
+                    }
 
-        # 2. Usar ComparisonAgent para comparación avanzada
-        if self.comparator and len(proposal_analyses) >= 2:
-            try:
-                # Preparar documentos
-                for proposal_id, analysis in proposal_analyses.items():
-                    if (
-                        "extraction" in analysis["stages"]
-                        and analysis["stages"]["extraction"]["status"] == "completed"
-                    ):
-                        content = analysis["stages"]["extraction"]["data"].get("content", "")
-                        if content:
-                            self.comparator.add_document(
-                                doc_id=proposal_id,
-                                content=content,
-                                doc_type="proposal",
-                                metadata={
-                                    "path": proposal_paths[int(proposal_id.split("_")[1]) - 1],
-                                    "analysis_summary": analysis.get("summary", {}),
-                                },
-                            )
-
-                # Vector DB y comparación
-                self.comparator.setup_vector_database()
-                proposal_ids = list(proposal_analyses.keys())
+                except Exception as e:
+                    error_msg = f"Error analizando propuesta {proposal_path}: {e}"
+                    logger.error(error_msg)
+                    comparison_result["errors"].append(error_msg)
+
+        # 2-3. El comparador guarda los documentos como estado: una comparación a la vez y
+        # partiendo de cero (sin documentos de comparaciones anteriores de este sistema)
+        with self._comparator_lock:
+            # 2. Usar ComparisonAgent para comparación avanzada
+            if self.comparator and len(proposal_analyses) >= 2:
+                try:
+                    self.comparator.clear_documents()
+                    # Preparar documentos
+                    for proposal_id, analysis in proposal_analyses.items():
+                        if (
+                            "extraction" in analysis["stages"]
+                            and analysis["stages"]["extraction"]["status"] == "completed"
+                        ):
+                            content = analysis["stages"]["extraction"]["data"].get("content", "")
+                            if content:
+                                self.comparator.add_document(
+                                    doc_id=proposal_id,
+                                    content=content,
+                                    doc_type="proposal",
+                                    metadata={
+                                        "path": proposal_paths[int(proposal_id.split("_")[1]) - 1],
+                                        "analysis_summary": analysis.get("summary", {}),
+                                    },
+                                )
+
+                    # Vector DB y comparación
+                    self.comparator.setup_vector_database()
+                    proposal_ids = list(proposal_analyses.keys())
                 
-                # Prepare classification and validation contexts
-                classification_contexts = {}
-                validation_contexts = {}
+                    # Prepare classification and validation contexts
+                    classification_contexts = {}
+                    validation_contexts = {}
                 
-                for proposal_id, analysis in proposal_analyses.items():
-                    # Extract classification results
-                    if ("classification" in analysis.get("stages", {}) and 
-                        analysis["stages"]["classification"]["status"] == "completed"):
-                        classification_contexts[proposal_id] = {
-                            "classification_results": analysis["stages"]["classification"]["data"],
-                            "document_sections": analysis["stages"]["classification"]["data"].get("sections", {}),
-                            "classification_confidence": analysis["stages"]["classification"]["data"].get("confidence", 0.5)
-                        }
+                    for proposal_id, analysis in proposal_analyses.items():
+                        # Extract classification results
+                        if ("classification" in analysis.get("stages", {}) and 
+                            analysis["stages"]["classification"]["status"] == "completed"):
+                            classification_contexts[proposal_id] = {
+                                "classification_results": analysis["stages"]["classification"]["data"],
+                                "document_sections": analysis["stages"]["classification"]["data"].get("sections", {}),
+                                "classification_confidence": analysis["stages"]["classification"]["data"].get("confidence", 0.5)
+                            }
                     
-                    # Extract validation results
-                    if ("validation" in analysis.get("stages", {}) and 
-                        analysis["stages"]["validation"]["status"] == "completed"):
-                        validation_contexts[proposal_id] = {
-                            "compliance_results": analysis["stages"]["validation"]["data"],
-                            "validation_score": analysis["stages"]["validation"]["data"].get("overall_compliance", 0.5),
-                            "regulatory_issues": analysis["stages"]["validation"]["data"].get("issues", [])
-                        }
+                        # Extract validation results
+                        if ("validation" in analysis.get("stages", {}) and 
+                            analysis["stages"]["validation"]["status"] == "completed"):
+                            validation_contexts[proposal_id] = {
+                                "compliance_results": analysis["stages"]["validation"]["data"],
+                                "validation_score": analysis["stages"]["validation"]["data"].get("overall_compliance", 0.5),
+                                "regulatory_issues": analysis["stages"]["validation"]["data"].get("issues", [])
+                            }
                     
-                    # Add risk assessment context if available
-                    if ("risk_assessment" in analysis.get("stages", {}) and 
-                        analysis["stages"]["risk_assessment"]["status"] == "completed"):
-                        if proposal_id not in classification_contexts:
-                            classification_contexts[proposal_id] = {}
-                        classification_contexts[proposal_id]["risk_assessment"] = analysis["stages"]["risk_assessment"]["data"]
-
-                # Use the new DSPy-enhanced comparison method with extracted content
-                doc_contents = {}
-                for proposal_id, analysis in proposal_analyses.items():
-                    if ("extraction" in analysis.get("stages", {}) and 
-                        analysis["stages"]["extraction"]["status"] == "completed"):
-                        content = analysis["stages"]["extraction"]["data"].get("content", "")
-                        doc_contents[proposal_id] = content
-                    else:
-                        doc_contents[proposal_id] = ""
+                        # Add risk assessment context if available
+                        if ("risk_assessment" in analysis.get("stages", {}) and 
+                            analysis["stages"]["risk_assessment"]["status"] == "completed"):
+                            if proposal_id not in classification_contexts:
+                                classification_contexts[proposal_id] = {}
+                            classification_contexts[proposal_id]["risk_assessment"] = analysis["stages"]["risk_assessment"]["data"]
+
+                    # Use the new DSPy-enhanced comparison method with extracted content
+                    doc_contents = {}
+                    for proposal_id, analysis in proposal_analyses.items():
+                        if ("extraction" in analysis.get("stages", {}) and 
+                            analysis["stages"]["extraction"]["status"] == "completed"):
+                            content = analysis["stages"]["extraction"]["data"].get("content", "")
+                            doc_contents[proposal_id] = content
+                        else:
+                            doc_contents[proposal_id] = ""
                 
-                multi_comparison = self.comparator.compare_multiple_documents_with_content(
-                    doc_contents=doc_contents,
-                    comparison_type="comprehensive",
-                    classification_contexts=classification_contexts,
-                    validation_contexts=validation_contexts
-                )
+                    multi_comparison = self.comparator.compare_multiple_documents_with_content(
+                        doc_contents=doc_contents,
+                        comparison_type="comprehensive",
+                        classification_contexts=classification_contexts,
+                        validation_contexts=validation_contexts
+                    )
 
-                comparison_result["advanced_comparison"] = multi_comparison
-                comparison_result["overall_ranking"] = multi_comparison.get("ranking", [])
+                    comparison_result["advanced_comparison"] = multi_comparison
+                    comparison_result["overall_ranking"] = multi_comparison.get("ranking", [])
 
-                if multi_comparison.get("ranking"):
-                    best_proposal = multi_comparison["ranking"][0]
-                    comparison_result["recommendation"] = {
-                        "recommended_proposal": best_proposal["document_id"],
-                        "score": best_proposal["average_score"],
-                        "reason": f"Mejor puntuación general: {best_proposal['average_score']:.2f}",
-                    }
+                    if multi_comparison.get("ranking"):
+                        best_proposal = multi_comparison["ranking"][0]
+                        comparison_result["recommendation"] = {
+                            "recommended_proposal": best_proposal["document_id"],
+                            "score": best_proposal["average_score"],
+                            "reason": f"Mejor puntuación general: {best_proposal['average_score']:.2f}",
+                        }
 
-            except Exception as e:
-                error_msg = f"Error en comparación avanzada: {e}"
-                logger.error(error_msg)
-                comparison_result["errors"].append(error_msg)
+                except Exception as e:
+                    error_msg = f"Error en comparación avanzada: {e}"
+                    logger.error(error_msg)
+                    comparison_result["errors"].append(error_msg)
 
-        # 3. Comparación estándar para 2 propuestas
-        if self.comparator and len(proposal_paths) == 2:
-            try:
-                self.comparator.clear_documents()
-                for i, proposal_id in enumerate(proposal_analyses.keys()):
-                    content = proposal_analyses[proposal_id]["stages"]["extraction"]["data"].get("content", "")
-                    self.comparator.add_proposal(
-                        proposal_id,
-                        content,
-                        metadata={"path": str(proposal_paths[i])}
-                    )
+            # 3. Comparación estándar para 2 propuestas
+            if self.comparator and len(proposal_paths) == 2:
+                try:
+                    self.comparator.clear_documents()
+                    for i, proposal_id in enumerate(proposal_analyses.keys()):
+                        content = proposal_analyses[proposal_id]["stages"]["extraction"]["data"].get("content", "")
+                        self.comparator.add_proposal(
+                            proposal_id,
+                            content,
+                            metadata={"path": str(proposal_paths[i])}
+                        )
 
 
-                self.comparator.setup_vector_database()
-                standard_comparison = self.comparator.compare_proposals()
-                comparison_result["standard_comparison"] = standard_comparison
+                    self.comparator.setup_vector_database()
+                    standard_comparison = self.comparator.compare_proposals()
+                    comparison_result["standard_comparison"] = standard_comparison
 
-            except Exception as e:
-                error_msg = f"Error en comparación estándar: {e}"
-                logger.error(error_msg)
-                comparison_result["errors"].append(error_msg)
+                except Exception as e:
+                    error_msg = f"Error en comparación estándar: {e}"
+                    logger.error(error_msg)
+                    comparison_result["errors"].append(error_msg)
 
         return comparison_result
 
-    def generate_comprehensive_report(self, document_ids: List[str], report_type: str = "comprehensive") -> Dict[str, Any]:
+    def generate_comprehensive_report(
+        self, document_ids: List[Union[str, AnalysisRef]], report_type: str = "comprehensive"
+    ) -> Dict[str, Any]:
         """
         Genera un reporte comprehensivo usando el ReportGenerationAgent
+        (acepta document_ids o AnalysisRef; los análisis que no estén en memoria se leen de disco)
         """
         logger.info(f"Generando reporte {report_type} para {len(document_ids)} documentos")
 
         try:
             analysis_data = {}
-            for doc_id in document_ids:
-                if doc_id in self.analysis_results:
-                    analysis_data[doc_id] = self.analysis_results[doc_id]
+            for ref in document_ids:
+                analysis = self.get_analysis(ref)
+                if analysis is not None:
+                    analysis_data[analysis["document_id"]] = analysis
 
             if not analysis_data:
                 raise ValueError("No hay datos de análisis disponibles para los documentos especificados")
@@ -612,7 +1203,6 @@ class BiddingAnalysisSystem:
 
     def _extract_rfp_requirements(self, content: str) -> Dict[str, Any]:
         """Extrae requisitos específicos del RFP"""
-        import re
 
         requirements = {
             "technical_requirements": [],
@@ -622,32 +1212,33 @@ class BiddingAnalysisSystem:
             "submission_requirements": [],
         }
 
-        patterns = {
-            "technical": [r"requisitos?\s+t[éeé]cnicos?", r"especificaciones?\s+t[éeé]cnicas?", r"tecnolog[íi]a\s+requerida"],
-            "functional": [r"requisitos?\s+funcionales?", r"funcionalidades?\s+requeridas?", r"caracter[íi]sticas\s+del\s+sistema"],
-            "compliance": [r"cumplimiento\s+normativo", r"regulaciones?\s+aplicables?", r"est[áa]ndares?\s+requeridos?"],
-        }
-
-        for req_type, type_patterns in patterns.items():
-            for pattern in type_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    start = max(0, match.start() - 200)
-                    end = min(len(content), match.end() + 500)
-                    context = content[start:end].strip()
-
-                    if req_type == "technical":
-                        requirements["technical_requirements"].append(context)
-                    elif req_type == "functional":
-                        requirements["functional_requirements"].append(context)
-                    elif req_type == "compliance":
-                        requirements["compliance_requirements"].append(context)
+        # Prefiltro: sin ningún literal ancla (p. ej. documentos que no son pliegos) no hace falta el regex
+        content_lower = content.lower()
+        if not any(anchor in content_lower for anchor in _RFP_REQUIREMENT_ANCHORS):
+            return requirements
+
+        # Una sola pasada; los contextos se agrupan por patrón para conservar el orden de salida
+        spans = {group: [] for group in _RFP_REQUIREMENT_GROUPS}
+        for match in _RFP_REQUIREMENT_RE.finditer(content):
+            spans[match.lastgroup].append(match.span())
+
+        for group, req_type in _RFP_REQUIREMENT_GROUPS.items():
+            for match_start, match_end in spans[group]:
+                start = max(0, match_start - 200)
+                end = min(len(content), match_end + 500)
+                context = content[start:end].strip()
+
+                if req_type == "technical":
+                    requirements["technical_requirements"].append(context)
+                elif req_type == "functional":
+                    requirements["functional_requirements"].append(context)
+                elif req_type == "compliance":
+                    requirements["compliance_requirements"].append(context)
 
         return requirements
 
     def _extract_evaluation_criteria(self, content: str) -> Dict[str, Any]:
         """Extrae criterios de evaluación del RFP"""
-        import re
 
         criteria = {
             "scoring_criteria": [],
@@ -656,38 +1247,51 @@ class BiddingAnalysisSystem:
             "evaluation_process": [],
         }
 
-        score_patterns = [
-            r"(\d+)\s*puntos?\s+por\s+(.{1,100})",
-            r"(\d+%)\s+(.{1,100})",
-            r"peso\s+(\d+)\s*%?\s+(.{1,100})",
-        ]
-
-        for pattern in score_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            for score, criterion in matches:
-                criteria["scoring_criteria"].append({"score": score, "criterion": criterion.strip()})
+        content_lower = content.lower()
+        for literal, pattern in _SCORE_PATTERNS:
+            if literal not in content_lower:
+                continue
+            criteria["scoring_criteria"].extend(
+                {"score": score, "criterion": criterion.strip()} for score, criterion in pattern.findall(content)
+            )
 
         return criteria
 
+    # Etapa -> método que resume sus hallazgos; el orden define el de `key_findings`
+    _SUMMARY_FINDINGS = {
+        "classification": "_classification_findings",
+        "validation": "_validation_findings",
+        "risk_analysis": "_risk_findings",
+        "ruc_validation": "_ruc_findings",
+    }
+
     def _generate_analysis_summary(self, analysis_result: Dict) -> Dict[str, Any]:
         """Genera un resumen del análisis realizado"""
 
+        stages = analysis_result.get("stages", {})
+
+        # Una sola pasada: cuenta estados y resume cada etapa completada
+        status_counts = Counter()
+        stage_findings = {}
+        for stage_name, stage_data in stages.items():
+            status = stage_data.get("status")
+            status_counts[status] += 1
+            if status == "completed" and stage_name in self._SUMMARY_FINDINGS:
+                stage_findings[stage_name] = getattr(self, self._SUMMARY_FINDINGS[stage_name])(stage_data["data"])
+
         summary = {
-            "total_stages": len(analysis_result.get("stages", {})),
-            "completed_stages": 0,
-            "failed_stages": 0,
+            "total_stages": len(stages),
+            "completed_stages": status_counts["completed"],
+            "failed_stages": status_counts["failed"],
             "overall_status": "unknown",
-            "key_findings": [],
+            "key_findings": [
+                finding
+                for stage_name in self._SUMMARY_FINDINGS
+                for finding in stage_findings.get(stage_name, ())
+            ],
             "recommendations": [],
         }
 
-        # Contar etapas
-        for stage_name, stage_data in analysis_result.get("stages", {}).items():
-            if stage_data.get("status") == "completed":
-                summary["completed_stages"] += 1
-            elif stage_data.get("status") == "failed":
-                summary["failed_stages"] += 1
-
         # Estado general
         if summary["failed_stages"] == 0:
             summary["overall_status"] = "success"
@@ -696,62 +1300,6 @@ class BiddingAnalysisSystem:
         else:
             summary["overall_status"] = "failed"
 
-        stages = analysis_result.get("stages", {})
-
-        # Clasificación (DSPy ⇒ sections es dict)
-        if "classification" in stages and stages["classification"].get("status") == "completed":
-            classification_data = stages["classification"]["data"]
-            sections = classification_data.get("sections", {})
-            if isinstance(sections, dict):
-                summary["key_findings"].append(f"Documento clasificado en {len(sections)} tipos de sección")
-                # Top 3 por # de fragmentos si existe document_count
-                try:
-                    top = sorted(
-                        sections.items(), key=lambda kv: kv[1].get("document_count", 0), reverse=True
-                    )[:3]
-                    nice = ", ".join(f"{name} ({info.get('document_count', 0)})" for name, info in top)
-                    if nice:
-                        summary["key_findings"].append(f"Secciones destacadas: {nice}")
-                except Exception:
-                    pass
-
-        # Validación (usar campos reales del validator)
-        if "validation" in stages and stages["validation"].get("status") == "completed":
-            validation_data = stages["validation"]["data"]
-            compliance_pct = (
-                validation_data.get("compliance_validation", {}).get("overall_compliance_percentage")
-            )
-            if compliance_pct is None:
-                compliance_pct = validation_data.get("overall_score", 0)
-            try:
-                summary["key_findings"].append(
-                    f"Puntuación de cumplimiento: {round(float(compliance_pct), 2)}%"
-                )
-            except Exception:
-                summary["key_findings"].append(f"Puntuación de cumplimiento: {compliance_pct}%")
-
-        # Riesgo
-        if "risk_analysis" in stages and stages["risk_analysis"].get("status") == "completed":
-            risk_data = stages["risk_analysis"]["data"]
-            if risk_data.get("overall_risk_score") is not None:
-                risk_score = risk_data["overall_risk_score"]
-                summary["key_findings"].append(f"Puntuación de riesgo general: {risk_score}")
-
-        # RUC
-        if "ruc_validation" in stages and stages["ruc_validation"].get("status") == "completed":
-            ruc_data = stages["ruc_validation"]["data"]
-            ruc_summary = ruc_data.get("validation_summary", {})
-            total_rucs = ruc_summary.get("total_rucs", 0)
-            if total_rucs > 0:
-                valid_fmt = ruc_summary.get("valid_format", 0)
-                compat = ruc_summary.get("compatible_entities", 0)
-                summary["key_findings"].append(f"RUCs con formato válido: {valid_fmt}/{total_rucs}")
-                summary["key_findings"].append(f"RUCs compatibles: {compat}/{total_rucs}")
-                if ruc_data.get("overall_score") is not None:
-                    ruc_score = ruc_data["overall_score"]
-                    ruc_level = ruc_data.get("validation_level", "DESCONOCIDO")
-                    summary["key_findings"].append(f"Validación RUC: {ruc_score}% ({ruc_level})")
-
         # Recomendaciones básicas
         if summary["overall_status"] == "success":
             summary["recommendations"].append("Análisis completado exitosamente. Revisar resultados detallados.")
@@ -762,6 +1310,58 @@ class BiddingAnalysisSystem:
 
         return summary
 
+    @staticmethod
+    def _classification_findings(classification_data: Dict[str, Any]) -> List[str]:
+        """Clasificación (DSPy ⇒ sections es dict)"""
+        findings = []
+        sections = classification_data.get("sections", {})
+        if isinstance(sections, dict):
+            findings.append(f"Documento clasificado en {len(sections)} tipos de sección")
+            # Top 3 por # de fragmentos si existe document_count
+            try:
+                top = heapq.nlargest(3, sections.items(), key=lambda kv: kv[1].get("document_count", 0))
+                nice = ", ".join(f"{name} ({info.get('document_count', 0)})" for name, info in top)
+                if nice:
+                    findings.append(f"Secciones destacadas: {nice}")
+            except Exception:
+                pass
+        return findings
+
+    @staticmethod
+    def _validation_findings(validation_data: Dict[str, Any]) -> List[str]:
+        """Validación (usar campos reales del validator)"""
+        compliance_pct = validation_data.get("compliance_validation", {}).get("overall_compliance_percentage")
+        if compliance_pct is None:
+            compliance_pct = validation_data.get("overall_score", 0)
+        try:
+            return [f"Puntuación de cumplimiento: {round(float(compliance_pct), 2)}%"]
+        except Exception:
+            return [f"Puntuación de cumplimiento: {compliance_pct}%"]
+
+    @staticmethod
+    def _risk_findings(risk_data: Dict[str, Any]) -> List[str]:
+        """Riesgo"""
+        if risk_data.get("overall_risk_score") is not None:
+            return [f"Puntuación de riesgo general: {risk_data['overall_risk_score']}"]
+        return []
+
+    @staticmethod
+    def _ruc_findings(ruc_data: Dict[str, Any]) -> List[str]:
+        """RUC"""
+        findings = []
+        ruc_summary = ruc_data.get("validation_summary", {})
+        total_rucs = ruc_summary.get("total_rucs", 0)
+        if total_rucs > 0:
+            valid_fmt = ruc_summary.get("valid_format", 0)
+            compat = ruc_summary.get("compatible_entities", 0)
+            findings.append(f"RUCs con formato válido: {valid_fmt}/{total_rucs}")
+            findings.append(f"RUCs compatibles: {compat}/{total_rucs}")
+            if ruc_data.get("overall_score") is not None:
+                ruc_score = ruc_data["overall_score"]
+                ruc_level = ruc_data.get("validation_level", "DESCONOCIDO")
+                findings.append(f"Validación RUC: {ruc_score}% ({ruc_level})")
+        return findings
+
     def get_system_status(self) -> Dict[str, Any]:
         """Obtiene el estado actual del sistema"""
 
@@ -784,21 +1384,33 @@ class BiddingAnalysisSystem:
 
     def export_results(self, output_path: str) -> bool:
         """
-        Exporta todos los resultados de análisis a un archivo JSON
+        Exporta todos los resultados de análisis a un archivo JSON.
+
+        Los análisis se serializan y escriben uno a uno (buffer de 1 MiB), de modo que
+        la memoria extra queda acotada por el análisis más grande y no por el total.
         """
-        try:
-            export_data = {
-                "system_info": self.get_system_status(),
-                "processed_documents": self.processed_documents,
-                "analysis_results": self.analysis_results,
-                "export_timestamp": datetime.now().isoformat(),
-            }
 
+        def nested(value: Any) -> bytes:
+            # JSON indentado un nivel más (las cadenas JSON no contienen saltos de línea literales)
+            return _json_bytes(value).replace(b"\n", b"\n    ")
+
+        try:
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            with self._results_lock:
+                processed_documents = dict(self.processed_documents)
+                analysis_results = list(self.analysis_results.items())
+
+            with open(output_path, "wb", buffering=1 << 20) as f:
+                f.write(b'{\n  "system_info": ' + _json_bytes(self.get_system_status()).replace(b"\n", b"\n  "))
+                f.write(b',\n  "processed_documents": ' + _json_bytes(processed_documents).replace(b"\n", b"\n  "))
+                f.write(b',\n  "analysis_results": {')
+                for i, (document_id, result) in enumerate(analysis_results):
+                    f.write(b"," if i else b"")
+                    f.write(b"\n    " + _json_bytes(document_id) + b": " + nested(result))
+                f.write(b"\n  }" if analysis_results else b"}")
+                f.write(b',\n  "export_timestamp": ' + _json_bytes(datetime.now().isoformat()) + b"\n}")
 
             logger.info(f"Resultados exportados a: {output_path}")
             return True
@@ -807,97 +1419,137 @@ class BiddingAnalysisSystem:
             logger.error(f"Error exportando resultados: {e}")
             return False
 
-    def _determine_work_type(self, content: str, document_type: str) -> str:
+    def _determine_work_type(self, content: str, document_type: str, content_lower: Optional[str] = None) -> str:
         """
         Determina el tipo de trabajo basado en el contenido del documento
+        (`content_lower` reutiliza la copia en minúsculas si ya se calculó).
+        El resultado sólo depende del texto: se memoriza por su digest BLAKE2b.
         """
-        content_lower = content.lower()
-
-        construction_keywords = [
-            "construcción",
-            "edificación",
-            "obra civil",
-            "infraestructura",
-            "concreto",
-            "acero",
-            "cemento",
-            "excavación",
-            "cimentación",
-            "estructura",
-            "albañilería",
-            "arquitectura",
-            "ingeniería civil",
-            "proyecto de construcción",
-            "obra pública",
-            "edificio",
-            "carretera",
-            "puente",
-            "túnel",
-            "drenaje",
-            "pavimento",
-        ]
-
-        services_keywords = [
-            "servicios profesionales",
-            "consultoría",
-            "asesoría",
-            "auditoría",
-            "capacitación",
-            "entrenamiento",
-            "diseño",
-            "estudios técnicos",
-            "supervisión",
-            "interventoría",
-            "servicios de ingeniería",
-            "servicios de arquitectura",
-            "mantenimiento",
-            "soporte técnico",
-            "desarrollo de software",
-        ]
-
-        supplies_keywords = [
-            "suministro",
-            "adquisición",
-            "compra",
-            "equipos",
-            "materiales",
-            "insumos",
-            "productos",
-            "bienes",
-            "mobiliario",
-            "tecnología",
-            "software",
-            "hardware",
-            "vehículos",
-            "maquinaria",
-            "herramientas",
-            "instrumentos",
-        ]
+        if content_lower is None:
+            content_lower = content.lower()
+
+        key = hashlib.blake2b(content_lower.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with _work_type_cache_lock:
+            work_type = _work_type_cache.get(key)
+        if work_type is not None:
+            return work_type
+
+        if _WORK_TYPE_AC is not None:
+            # Una sola pasada sobre el texto para todas las palabras clave
+            found = {keyword for _, keyword in _WORK_TYPE_AC.iter(content_lower)}
+            present = found.__contains__
+        else:
+            present = content_lower.__contains__
 
-        construction_score = sum(1 for keyword in construction_keywords if keyword in content_lower)
-        services_score = sum(1 for keyword in services_keywords if keyword in content_lower)
-        supplies_score = sum(1 for keyword in supplies_keywords if keyword in content_lower)
+        construction_score, services_score, supplies_score = (
+            sum(1 for keyword in keywords if present(keyword)) for keywords in _WORK_TYPE_KEYWORDS.values()
+        )
 
         if construction_score >= services_score and construction_score >= supplies_score:
-            return "CONSTRUCCION"
+            work_type = "CONSTRUCCION"
         elif services_score >= supplies_score:
-            return "SERVICIOS"
+            work_type = "SERVICIOS"
         else:
-            return "SUMINISTROS"
+            work_type = "SUMINISTROS"
 
+        with _work_type_cache_lock:
+            _work_type_cache[key] = work_type
+            if len(_work_type_cache) > _WORK_TYPE_CACHE_SIZE:
+                _work_type_cache.popitem(last=False)
+        return work_type
 
 class RFPAnalyzer:
     """
     Analizador especializado de RFPs sobre el BiddingAnalysisSystem.
     """
 
-    def __init__(self, data_dir: str = DATA_DIR):
+    # RFPs analizados a la vez en compare_with_previous_rfps
+    MAX_PARALLEL_RFPS = 8
+
+    def __init__(self, data_dir: Union[str, Path] = DATA_DIR):
         self.bidding_system = BiddingAnalysisSystem(data_dir)
         self.rfp_analyses = {}
+        self.rfp_cache_dir = RFP_CACHE_DIR
+        # Análisis de RFP por clave de archivo (ver _rfp_cache_key)
+        self._rfp_cache: Dict[str, Dict[str, Any]] = {}
+        # (comparador, proveedor de embeddings, base vectorial, documentos) de la última comparación
+        self._indexed_rfps: Optional[tuple] = None
         logger.info("RFPAnalyzer inicializado")
 
-    def analyze_rfp(self, rfp_path: str) -> Dict[str, Any]:
-        return self.bidding_system.analyze_rfp_requirements(rfp_path)
+    # Los agentes se delegan al sistema subyacente y se construyen en el primer acceso
+
+    @cached_property
+    def document_extractor(self):
+        return self.bidding_system.document_extractor
+
+    @cached_property
+    def classifier(self):
+        return self.bidding_system.classifier
+
+    @cached_property
+    def validator(self):
+        return self.bidding_system.validator
+
+    @staticmethod
+    def _rfp_cache_key(rfp_path: str) -> str:
+        """Clave del archivo: ruta absoluta, mtime y tamaño (cambia si el archivo se modifica)."""
+        path = os.path.abspath(rfp_path)
+        st = os.stat(path)
+        return hashlib.sha256(f"{path}|{st.st_mtime_ns}|{st.st_size}".encode("utf-8")).hexdigest()
+
+    def analyze_rfp(self, rfp_path: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Analiza un RFP; con `use_cache` se reutiliza el análisis previo del mismo archivo
+        (en memoria o en `rfp_cache_dir`) mientras no cambien su mtime ni su tamaño.
+        """
+        if not use_cache:
+            return self.bidding_system.analyze_rfp_requirements(rfp_path)
+
+        try:
+            key = self._rfp_cache_key(rfp_path)
+        except OSError:
+            return self.bidding_system.analyze_rfp_requirements(rfp_path)
+
+        analysis = self._rfp_cache.get(key)
+        if analysis is not None:
+            return analysis
+
+        cache_file = self.rfp_cache_dir / f"{key}.json"
+        if cache_file.exists():
+            try:
+                analysis = self._rfp_cache[key] = json.loads(cache_file.read_bytes())
+                logger.info(f"Análisis de RFP recuperado de caché: {rfp_path}")
+                return analysis
+            except Exception as e:
+                logger.warning(f"Caché de RFP ilegible, se vuelve a analizar: {e}")
+
+        analysis = self.bidding_system.analyze_rfp_requirements(rfp_path)
+        # Sólo se memorizan análisis completos
+        if not analysis.get("errors") and "rfp_analysis_error" not in analysis:
+            self._rfp_cache[key] = analysis
+            try:
+                self.rfp_cache_dir.mkdir(parents=True, exist_ok=True)
+                cache_file.write_bytes(_json_bytes(analysis))
+            except Exception as e:
+                logger.warning(f"No se pudo guardar el análisis de RFP en caché: {e}")
+        return analysis
+
+    def clear_cache(self) -> None:
+        """Borra los análisis de RFP memorizados, en memoria y en disco."""
+        self._rfp_cache.clear()
+        for cache_file in self.rfp_cache_dir.glob("*.json"):
+            try:
+                cache_file.unlink()
+            except OSError as e:
+                logger.warning(f"No se pudo borrar {cache_file}: {e}")
+
+    def _safe_analyze_rfp(self, rfp_path: str) -> Optional[Dict[str, Any]]:
+        """analyze_rfp para los RFPs anteriores: un fallo se registra y no detiene la comparación."""
+        try:
+            return self.analyze_rfp(rfp_path)
+        except Exception as e:
+            logger.error(f"Error analizando RFP anterior {rfp_path}: {e}")
+            return None
 
     def extract_requirements_summary(self, rfp_analysis: Dict) -> Dict[str, Any]:
         summary = {
@@ -916,30 +1568,28 @@ class RFPAnalyzer:
             count = len(requirements) if isinstance(requirements, list) else 0
             summary["total_requirements"] += count
 
-            if req_type == "technical_requirements":
-                summary["technical_requirements_count"] = count
-            elif req_type == "functional_requirements":
-                summary["functional_requirements_count"] = count
-            elif req_type == "compliance_requirements":
-                summary["compliance_requirements_count"] = count
-
-        if "classification" in rfp_analysis.get("stages", {}):
-            classification_data = rfp_analysis["stages"]["classification"].get("data", {})
-            sections = classification_data.get("sections", {})
-            if isinstance(sections, dict):
-                for name, info in sections.items():
-                    try:
-                        conf = info.get("dspy_analysis", {}).get("avg_combined_confidence", 0.0)
-                        if conf > 0.7:
-                            summary["key_sections"].append(
-                                {
-                                    "section": name,
-                                    "confidence": conf,
-                                    "content_preview": info.get("content_preview", "")[:100],
-                                }
-                            )
-                    except Exception:
-                        continue
+            count_key = _REQ_TYPE_COUNT_KEY.get(req_type)
+            if count_key:
+                summary[count_key] = count
+
+        # Secciones con confianza > 0.7 (las entradas mal formadas se ignoran)
+        classification = rfp_analysis.get("stages", {}).get("classification")
+        sections = (classification.get("data") or {}).get("sections") if classification else None
+        if isinstance(sections, dict):
+            key_sections = summary["key_sections"]
+            for name, info in sections.items():
+                if not isinstance(info, dict):
+                    continue
+                dspy_analysis = info.get("dspy_analysis", {})
+                conf = dspy_analysis.get("avg_combined_confidence", 0.0) if isinstance(dspy_analysis, dict) else None
+                if isinstance(conf, (int, float)) and conf > 0.7:
+                    key_sections.append(
+                        {
+                            "section": name,
+                            "confidence": conf,
+                            "content_preview": (info.get("content_preview") or "")[:100],
+                        }
+                    )
 
         evaluation_criteria = rfp_analysis.get("evaluation_criteria", {})
         scoring_criteria = evaluation_criteria.get("scoring_criteria", [])
@@ -948,19 +1598,32 @@ class RFPAnalyzer:
 
         return summary
 
+    def _comparator_holds(self, comparator, batch: List[Dict[str, Any]]) -> bool:
+        """
+        True si el comparador sigue indexando exactamente `batch` desde la última comparación:
+        mismo proveedor y base vectorial, y los mismos textos (los análisis memorizados por
+        analyze_rfp devuelven los mismos objetos mientras los archivos no cambien).
+        """
+        if self._indexed_rfps is None:
+            return False
+        indexed_comparator, provider, vector_db, indexed_batch = self._indexed_rfps
+        return (
+            indexed_comparator is comparator
+            and provider is comparator.embeddings_provider
+            and vector_db is comparator.vector_db
+            and len(batch) == len(indexed_batch) == len(comparator.documents)
+            and all(
+                doc["doc_id"] == indexed["doc_id"]
+                and doc["content"] is indexed["content"]
+                and doc["metadata"] == indexed["metadata"]
+                and comparator.documents.get(doc["doc_id"], {}).get("content") is doc["content"]
+                for doc, indexed in zip(batch, indexed_batch)
+            )
+        )
+
     def compare_with_previous_rfps(self, current_rfp_path: str, previous_rfp_paths: List[str]) -> Dict[str, Any]:
         logger.info(f"Comparando RFP actual con {len(previous_rfp_paths)} RFPs anteriores")
 
-        current_analysis = self.analyze_rfp(current_rfp_path)
-
-        previous_analyses = []
-        for rfp_path in previous_rfp_paths:
-            try:
-                analysis = self.analyze_rfp(rfp_path)
-                previous_analyses.append(analysis)
-            except Exception as e:
-                logger.error(f"Error analizando RFP anterior {rfp_path}: {e}")
-
         comparison_result = {
             "current_rfp": current_rfp_path,
             "previous_rfps": previous_rfp_paths,
@@ -969,53 +1632,93 @@ class RFPAnalyzer:
             "trends_analysis": {},
             "recommendations": [],
         }
+        # Sin RFPs anteriores no hay nada que comparar: ni se analiza el actual ni se toca el comparador
+        if not previous_rfp_paths:
+            return comparison_result
+
+        # El RFP actual y los anteriores se analizan en paralelo (extracción y agentes esperan E/S)
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.MAX_PARALLEL_RFPS, len(previous_rfp_paths) + 1))
+        ) as pool:
+            current_future = pool.submit(self.analyze_rfp, current_rfp_path)
+            previous_results = list(pool.map(self._safe_analyze_rfp, previous_rfp_paths))
+            current_analysis = current_future.result()
+
+        # (ruta, análisis) de los RFPs anteriores analizados sin error
+        previous_analyses = [
+            (rfp_path, analysis)
+            for rfp_path, analysis in zip(previous_rfp_paths, previous_results)
+            if analysis is not None
+        ]
 
-        try:
-            comparator = self.bidding_system.comparator or ComparisonAgent()
-
-            if getattr(comparator, "embeddings_provider", None) is None:
-                ok = comparator.initialize_embeddings(provider="auto", model=None)
-                if not ok:
-                    logger.warning("No se pudieron inicializar embeddings; se hará comparación básica.")
-
-            # Limpia cualquier estado previo por si se reutiliza el comparador del sistema
-            comparator.clear_documents()
-
-            current_content = ""
-            if "extraction" in current_analysis["stages"]:
-                current_content = current_analysis["stages"]["extraction"]["data"].get("content", "")
-
-            if current_content:
-                comparator.add_document(
-                    doc_id="current_rfp",
-                    content=current_content,
-                    doc_type="rfp",
-                    metadata={"path": current_rfp_path},
-                )
+        # El comparador del sistema guarda los RFPs como estado: una comparación a la vez
+        with self.bidding_system._comparator_lock:
+            try:
+                comparator = self.bidding_system.comparator or _agent_class("ComparisonAgent")()
+
+                if getattr(comparator, "embeddings_provider", None) is None:
+                    ok = comparator.initialize_embeddings(provider="auto", model=None)
+                    if not ok:
+                        logger.warning("No se pudieron inicializar embeddings; se hará comparación básica.")
+
+                batch = []
+                for doc_id, rfp_path, analysis in [("current_rfp", current_rfp_path, current_analysis)] + [
+                    (f"previous_rfp_{i}", prev_path, prev_analysis)
+                    for i, (prev_path, prev_analysis) in enumerate(previous_analyses)
+                ]:
+                    content = ""
+                    if "extraction" in analysis["stages"]:
+                        content = analysis["stages"]["extraction"]["data"].get("content", "")
 
-            for i, prev_analysis in enumerate(previous_analyses):
-                prev_content = ""
-                if "extraction" in prev_analysis["stages"]:
-                    prev_content = prev_analysis["stages"]["extraction"]["data"].get("content", "")
-
-                if prev_content:
-                    comparator.add_document(
-                        doc_id=f"previous_rfp_{i}",
-                        content=prev_content,
-                        doc_type="rfp",
-                        metadata={"path": previous_rfp_paths[i]},
-                    )
+                    if content:
+                        batch.append({"doc_id": doc_id, "content": content, "doc_type": "rfp", "metadata": {"path": rfp_path}})
 
-            if previous_analyses:
-                # ⚠️ Sólo tiene efecto “semántico” si embeddings se inicializaron
-                comparator.setup_vector_database()
+                if self._comparator_holds(comparator, batch):
+                    logger.info("Mismos RFPs que en la comparación anterior: se reutiliza la base vectorial")
+                else:
+                    self._indexed_rfps = None
+                    # Limpia cualquier estado previo por si se reutiliza el comparador del sistema
+                    comparator.clear_documents()
+
+                    # Se registran todos de una vez desde este hilo (el comparador no es seguro entre
+                    # hilos); los embeddings se calculan en un solo lote en setup_vector_database()
+                    if hasattr(comparator, "add_documents"):
+                        comparator.add_documents(batch)
+                    else:
+                        for doc in batch:
+                            comparator.add_document(**doc)
 
-                for i in range(len(previous_analyses)):
-                    comparison = comparator.comprehensive_comparison("current_rfp", f"previous_rfp_{i}")
-                    comparison_result["comparisons"].append(comparison)
+                    # ⚠️ Sólo tiene efecto “semántico” si embeddings se inicializaron
+                    if previous_analyses and comparator.setup_vector_database():
+                        self._indexed_rfps = (comparator, comparator.embeddings_provider, comparator.vector_db, batch)
 
-        except Exception as e:
-            logger.error(f"Error en comparación de RFPs: {e}")
-            comparison_result["error"] = str(e)
+                if previous_analyses:
+                    for i in range(len(previous_analyses)):
+                        comparison = comparator.comprehensive_comparison("current_rfp", f"previous_rfp_{i}")
+                        comparison_result["comparisons"].append(comparison)
+
+            except Exception as e:
+                logger.error(f"Error en comparación de RFPs: {e}")
+                comparison_result["error"] = str(e)
 
         return comparison_result
+
+
+# Sistema propio de cada proceso del pool de analyze_documents
+_WORKER_SYSTEM: Optional[BiddingAnalysisSystem] = None
+
+
+def _init_analysis_worker(data_dir: str) -> None:
+    """Initializer de ProcessPoolExecutor: crea el sistema del proceso una sola vez."""
+    global _WORKER_SYSTEM
+    _WORKER_SYSTEM = BiddingAnalysisSystem(data_dir)
+
+
+def _analyze_one(document_path: str, document_type: str, analysis_level: str) -> Dict[str, Any]:
+    """Worker de ProcessPoolExecutor: analiza un documento con el sistema del proceso."""
+    assert _WORKER_SYSTEM is not None
+    try:
+        return _WORKER_SYSTEM.analyze_document(document_path, document_type, analysis_level)
+    except Exception as e:
+        logger.error(f"Error analizando {document_path}: {e}")
+        return {"document_path": document_path, "errors": [str(e)]}